@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import timezone
+
+from ranking import canonicalize_url, parse_published
+
+ARTICLE_RETENTION_DAYS = 7
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """
+    Articles seen by earlier runs in SQLite, keyed by canonical URL.
+
+    Each row keeps the article's RSS metadata, its scraped text with a content
+    hash, and the editor's summary of exactly that content (Korean title,
+    summary and key points). A later run reuses a summary as long as the
+    article's content hash is unchanged. Rows not seen for retention_days are
+    evicted.
+    """
+
+    def __init__(self, path: str, retention_days: float = ARTICLE_RETENTION_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.retention_days = retention_days
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                title TEXT,
+                source TEXT,
+                category TEXT,
+                published_at TEXT,
+                rss_summary TEXT,
+                content TEXT,
+                summary TEXT,
+                summary_hash TEXT,
+                last_seen REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_published ON articles (published_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_source ON articles (source)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_last_seen ON articles (last_seen)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def record(self, articles: list[dict]):
+        """
+        Upserts fetched articles (RSS metadata plus scraped "content"). A changed
+        content hash keeps the old summary row but it no longer matches.
+        """
+        now = time.time()
+        rows = []
+        for article in articles:
+            published = parse_published(article.get("published_date", ""))
+            content = article.get("content", "")
+            rows.append((
+                canonicalize_url(article["url"]),
+                content_hash(content),
+                article.get("title"),
+                article.get("source"),
+                article.get("category"),
+                published.astimezone(timezone.utc).isoformat() if published else None,
+                article.get("summary"),
+                content,
+                now,
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO articles (url, content_hash, title, source, category, published_at, rss_summary, content, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    content_hash = excluded.content_hash, title = excluded.title, source = excluded.source,
+                    category = excluded.category, published_at = excluded.published_at,
+                    rss_summary = excluded.rss_summary, content = excluded.content, last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+
+    def summaries(self, articles: list[dict]) -> dict[str, dict]:
+        """Returns the memoized summaries of articles whose content is unchanged, by original URL."""
+        by_canonical = {canonicalize_url(article["url"]): article for article in articles}
+        if not by_canonical:
+            return {}
+        placeholders = ",".join("?" * len(by_canonical))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT url, summary, summary_hash FROM articles WHERE url IN ({placeholders}) AND summary IS NOT NULL",
+                list(by_canonical),
+            ).fetchall()
+        found = {}
+        for url, summary, summary_hash in rows:
+            article = by_canonical[url]
+            if summary_hash == content_hash(article.get("content", "")):
+                found[article["url"]] = json.loads(summary)
+        return found
+
+    def put_summaries(self, articles: list[dict], summaries: list[dict]):
+        """Memoizes each article's summary against the content it was made from."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE articles SET summary = ?, summary_hash = ? WHERE url = ?",
+                [
+                    (json.dumps(summary, ensure_ascii=False), content_hash(article.get("content", "")), canonicalize_url(article["url"]))
+                    for article, summary in zip(articles, summaries)
+                ],
+            )
+
+    def evict(self) -> int:
+        """Deletes articles not seen for retention_days; returns how many."""
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM articles WHERE last_seen < ?", (cutoff,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,234 @@
+"""
+Offline benchmark for the news pipeline.
+
+Replays the recorded feeds in fixtures/rss and the scraped articles in
+fixtures/articles.json through a local HTTP stand-in for the feed hosts and the
+Firecrawl API, summarizes with a fake LLM of configurable latency, and reports
+p50/p95 latency and throughput for the fetch, rank, scrape, summarize and
+deliver stages. Nothing leaves the machine.
+
+Usage:
+    python benchmark.py --iterations 10 --feed-latency 0.05 --llm-latency 0.2
+    python benchmark.py --json > bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from feed_registry import FeedSource
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Keep caches and metrics of benchmark runs away from the bot's data directory.
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="newsbot-bench-")
+os.environ.setdefault("FIRECRAWL_API_KEY", "fc-benchmark")
+
+
+# --- Local stand-ins ---
+class FixtureServer:
+    """Serves recorded RSS feeds (GET /rss/<name>.xml) and a Firecrawl-compatible POST /v2/scrape."""
+
+    def __init__(self, feed_latency: float, scrape_latency: float):
+        feeds = {}
+        for filename in sorted(os.listdir(os.path.join(FIXTURES_DIR, "rss"))):
+            with open(os.path.join(FIXTURES_DIR, "rss", filename), "rb") as f:
+                feeds[filename] = f.read()
+        with open(os.path.join(FIXTURES_DIR, "articles.json"), encoding="utf-8") as f:
+            articles = json.load(f)
+        self.feed_names = list(feeds)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = feeds.get(self.path.split("?")[0].rsplit("/", 1)[-1])
+                time.sleep(feed_latency)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self._reply(200, "application/rss+xml; charset=utf-8", body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                url = request.get("url", "")
+                article = articles.get(url, {"title": url, "markdown": f"# {url}\n\nNo recorded content."})
+                time.sleep(scrape_latency)
+                body = json.dumps({
+                    "success": True,
+                    "data": {"markdown": article["markdown"], "metadata": {"title": article["title"], "sourceURL": url}},
+                }).encode()
+                self._reply(200, "application/json", body)
+
+            def _reply(self, status: int, content_type: str, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def feed_sources(self, count: int) -> list[FeedSource]:
+        """Returns count feed sources, cycling through the recorded feeds."""
+        return [
+            FeedSource(f"Source {i + 1}", f"{self.url}/rss/{self.feed_names[i % len(self.feed_names)]}?copy={i}", "benchmark")
+            for i in range(count)
+        ]
+
+    def close(self):
+        self._server.shutdown()
+
+
+def _summary_reply(messages: Any) -> str:
+    """Canned summarizer reply: one valid summary per article in the prompt's batch."""
+    batch = json.loads(messages[-1]["content"].split("Articles:\n", 1)[1])
+    return json.dumps({"articles": [
+        {
+            "original_title": article["title"],
+            "title": article["title"],
+            "full_content_summary": "요약",
+            "key_points": ["핵심"],
+            "article_url": article["article_url"],
+            "importance_score": 5,
+        }
+        for article in batch
+    ]}, ensure_ascii=False)
+
+
+class FakeLLM:
+    """Stands in for the chat model: sleeps for latency seconds and returns a canned answer."""
+
+    model = "fake-llm"
+
+    def __init__(self, latency: float, respond: Callable[[Any], str] | None = None):
+        self.latency = latency
+        self.respond = respond or _summary_reply
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return self.respond(messages)
+
+
+class FakeBot:
+    """Telegram bot stand-in whose send_message takes latency seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any):
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+
+# --- Stages ---
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    import logging
+
+    import bot
+    import news_feeds
+    from delivery import Broadcaster
+    from ranking import rank_articles
+    from scraper import BatchScraper, ContentCache
+    from llm_cache import CachedLLM, LLMCache
+    from summarizer import BatchSummarizer
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server = FixtureServer(args.feed_latency, args.scrape_latency)
+    sources = server.feed_sources(args.feeds)
+    cache = ContentCache(os.path.join(os.environ["DATA_DIR"], "content_cache")) if args.content_cache else None
+    scraper = BatchScraper(os.environ["FIRECRAWL_API_KEY"], server.url, cache=cache)
+    llm = FakeLLM(args.llm_latency)
+    if args.llm_cache:
+        llm = CachedLLM(llm, LLMCache(os.path.join(os.environ["DATA_DIR"], "llm_cache.db")))
+    summarizer = BatchSummarizer(llm)
+    fake_bot = FakeBot(args.send_latency)
+    with open(os.path.join(os.path.dirname(FIXTURES_DIR), "output", "final_news_briefing.md"), encoding="utf-8") as f:
+        briefing = f.read()
+
+    samples: dict[str, list[tuple[float, int]]] = {stage: [] for stage in ("fetch", "rank", "scrape", "summarize", "deliver")}
+
+    def measure(stage: str, fn: Callable[[], Any], items: Callable[[Any], int]) -> Any:
+        started = time.perf_counter()
+        result = fn()
+        samples[stage].append((time.perf_counter() - started, items(result)))
+        return result
+
+    chunks = bot.split_message(briefing)
+
+    async def deliver():
+        # A fresh broadcaster per run: its token buckets belong to this event loop.
+        broadcaster = Broadcaster(global_rate=args.send_rate)
+        stats = await broadcaster.broadcast(fake_bot, list(range(args.chats)), chunks)
+        return stats["delivered"]
+
+    try:
+        for _ in range(args.iterations):
+            raw = measure("fetch", lambda: news_feeds.get_rss(sources), len)
+            ranked = measure("rank", lambda: rank_articles(raw), len)
+            scraped = measure("scrape", lambda: scraper.scrape_many([a["url"] for a in ranked]), len)
+            articles = [{**article, "content": page["content"]} for article, page in zip(ranked, scraped)]
+            measure("summarize", lambda: summarizer.summarize(articles), len)
+            measure("deliver", lambda: asyncio.run(deliver()), lambda chats: chats)
+    finally:
+        server.close()
+
+    report = {}
+    for stage, values in samples.items():
+        latencies = [seconds for seconds, _ in values]
+        total_items = sum(items for _, items in values)
+        report[stage] = {
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "items_per_run": total_items / len(values),
+            "throughput_per_s": round(total_items / sum(latencies), 2) if sum(latencies) else 0.0,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the news pipeline.")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--feeds", type=int, default=8, help="number of feed sources to replay")
+    parser.add_argument("--chats", type=int, default=20, help="chats to deliver the briefing to")
+    parser.add_argument("--feed-latency", type=float, default=0.05, help="seconds per feed request")
+    parser.add_argument("--scrape-latency", type=float, default=0.2, help="seconds per scrape request")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="seconds per LLM call")
+    parser.add_argument("--send-latency", type=float, default=0.01, help="seconds per Telegram send")
+    parser.add_argument("--send-rate", type=float, default=25, help="global Telegram messages per second")
+    parser.add_argument("--content-cache", action="store_true", help="scrape through the on-disk content cache")
+    parser.add_argument("--llm-cache", action="store_true", help="summarize through the on-disk LLM response cache")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'stage':<10} {'p50 ms':>10} {'p95 ms':>10} {'items/run':>10} {'items/s':>10}")
+    for stage, row in report.items():
+        print(f"{stage:<10} {row['p50_ms']:>10} {row['p95_ms']:>10} {row['items_per_run']:>10g} {row['throughput_per_s']:>10}")
+
+
+if __name__ == "__main__":
+    main()
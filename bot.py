@@ -1,88 +1,427 @@
+import asyncio
 import logging
 import os
 from datetime import datetime, time, timedelta
+from functools import lru_cache
 import pytz
-from telegram import Update
+from apscheduler.triggers.cron import CronTrigger
+from telegram import Message, Update
+from telegram.error import BadRequest
 from telegram.ext import (Application, CallbackContext, CommandHandler,
                           ContextTypes)
 
-from news_crew import NewsCrew
+from briefing_cache import BriefingCache
+from briefing_executor import BriefingExecutor, BriefingQueueFull, BriefingTimeout
+from briefing_queue import DONE, FAILED, BriefingJobFailed, BriefingQueue
+from chunker import chunk_message
+from crew_runner import kickoff_crew, load_crew_stack
+from delivery import Broadcaster
+from delivery_log import CACHED, ERROR, FULL, RSS, DeliveryLog
+import env  # loads .env before the configuration below is read
+from feed_health import FeedHealth
+from feed_registry import FEEDS_CONFIG, FeedRegistry
+import metrics
+from personalize import render_briefing, select_articles
+from preference_store import MAX_ARTICLE_COUNT, Preferences, PreferenceStore
+from schedule_store import Schedule, ScheduleStore
+from streaming import BriefingProgress, StageCallback, render_progress
 
 # --- Configuration ---
 # It's recommended to set this as an environment variable for security.
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TIMEZONE = pytz.timezone("Europe/Berlin")
 MAX_MESSAGE_LENGTH = 3000
+# Briefing generation runs on a bounded worker pool, off the event loop.
+BRIEFING_WORKERS = int(os.getenv("BRIEFING_WORKERS", "2"))
+BRIEFING_MAX_PENDING = int(os.getenv("BRIEFING_MAX_PENDING", "8"))
+BRIEFING_TIMEOUT = float(os.getenv("BRIEFING_TIMEOUT", "900"))
+# One briefing is shared by every chat within the same time window.
+DATA_DIR = os.getenv("DATA_DIR", "data")
+BRIEFING_CACHE_WINDOW = int(os.getenv("BRIEFING_CACHE_WINDOW", "60"))  # minutes
+BRIEFING_CACHE_TTL = float(os.getenv("BRIEFING_CACHE_TTL", "3600"))  # seconds
+BOT_DB_PATH = os.path.join(DATA_DIR, "bot.db")
+# Scheduled briefings are generated this many minutes before their delivery slot.
+BRIEFING_PREWARM_MINUTES = int(os.getenv("BRIEFING_PREWARM_MINUTES", "10"))
+# Chat IDs allowed to use admin commands such as /stats (comma-separated).
+ADMIN_CHAT_IDS = {int(x) for x in os.getenv("ADMIN_CHAT_IDS", "").split(",") if x.strip()}
+# /get streams headlines and summaries into its status message while the crew runs.
+STREAM_BRIEFINGS = os.getenv("STREAM_BRIEFINGS", "1") == "1"
+# With BRIEFING_QUEUE=1 briefings are generated by worker processes (worker.py)
+# that consume a durable SQLite queue, instead of on this process's executor.
+BRIEFING_QUEUE = os.getenv("BRIEFING_QUEUE", "0") == "1"
+QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "1"))  # seconds
+# The crew stack (crewai, litellm, tools) is imported in the background after
+# startup. Never in queue mode: the workers run the crew and the bot does not load it.
+CREW_PREWARM = os.getenv("CREW_PREWARM", "1") == "1" and not BRIEFING_QUEUE
+# A scheduled briefing that is not ready BRIEFING_DEADLINE seconds after its slot
+# time is served degraded: RSS summaries curated locally (given RSS_FALLBACK_TIMEOUT
+# seconds), else the last cached briefing. The full one replaces it when ready.
+BRIEFING_DEADLINE = float(os.getenv("BRIEFING_DEADLINE", "60"))
+RSS_FALLBACK_TIMEOUT = float(os.getenv("RSS_FALLBACK_TIMEOUT", "20"))
+# Outgoing messages are throttled below Telegram's global and per-chat limits.
+DELIVERY_GLOBAL_RATE = float(os.getenv("DELIVERY_GLOBAL_RATE", "25"))  # messages per second
+DELIVERY_CONCURRENCY = int(os.getenv("DELIVERY_CONCURRENCY", "50"))  # chats sent to at once
 
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 logger = logging.getLogger(__name__)
+logging.getLogger("apscheduler").setLevel(logging.WARNING)
 
+briefing_executor = BriefingExecutor(
+    max_workers=BRIEFING_WORKERS, max_pending=BRIEFING_MAX_PENDING, timeout=BRIEFING_TIMEOUT
+)
+schedule_store = ScheduleStore(BOT_DB_PATH)
+preference_store = PreferenceStore(BOT_DB_PATH)
+delivery_log = DeliveryLog(BOT_DB_PATH)
+briefing_cache = BriefingCache(
+    os.path.join(DATA_DIR, "briefing_cache.json"),
+    window_minutes=BRIEFING_CACHE_WINDOW,
+    ttl=BRIEFING_CACHE_TTL,
+)
+briefing_queue = BriefingQueue(os.path.join(DATA_DIR, "briefing_queue.db")) if BRIEFING_QUEUE else None
+briefing_progress = BriefingProgress()
+broadcaster = Broadcaster(global_rate=DELIVERY_GLOBAL_RATE, concurrency=DELIVERY_CONCURRENCY)
 
-# --- Placeholder for News Generation ---
-def kickoff_crew() -> str:
+
+# --- News Generation ---
+def _kickoff_and_cache(window: str) -> str:
+    """Generates the briefing for a time window and stores it, with its article pool, in the shared cache."""
+    try:
+        briefing, pool = kickoff_crew(task_callback=briefing_progress.callback_for(window))
+    finally:
+        briefing_progress.finish(window)
+    briefing_cache.put(window, briefing, pool)
+    logger.info(f"Briefing cache updated for window {window}: {briefing_cache.stats()}")
+    return briefing
+
+
+async def get_briefing(when: datetime, on_progress: StageCallback | None = None) -> str:
     """
-    This is a dummy function to simulate fetching and generating a news briefing.
-    In a real application, this function would contain the logic to call a news API,
-    process the data with a language model, and return the final text.
+    Returns the briefing for the cache window containing `when`, generating it on
+    the briefing executor (or the worker processes, in queue mode) if needed.
+    Concurrent requests for the same window share one kickoff. on_progress is
+    called with each crew task's output while the briefing is being generated
+    in this process. Raises the executor's or queue's errors.
     """
-    news_crew = NewsCrew()
-    result = news_crew.crew().kickoff()
-    return result.raw
+    window = briefing_cache.window_key(when.astimezone(TIMEZONE))
+    cached = briefing_cache.get(window)
+    if cached is not None:
+        logger.info(f"Serving cached briefing for window {window}")
+        return cached
+    if briefing_queue is not None:
+        return await _await_queued_briefing(window)
+    unsubscribe = briefing_progress.subscribe(window, on_progress) if on_progress else None
+    try:
+        return await briefing_executor.run(f"briefing:{window}", _kickoff_and_cache, window)
+    finally:
+        if unsubscribe is not None:
+            unsubscribe()
+
+
+async def _await_queued_briefing(window: str) -> str:
+    """Enqueues the window's briefing job for the workers and waits for their result."""
+    job_id = await asyncio.to_thread(briefing_queue.enqueue, window, BRIEFING_MAX_PENDING)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + BRIEFING_TIMEOUT
+    while loop.time() < deadline:
+        job = await asyncio.to_thread(briefing_queue.get, job_id)
+        if job is None or job.status == FAILED:
+            raise BriefingJobFailed(f"Briefing job {job_id} ({window}) failed: {job.error if job else 'purged'}")
+        if job.status == DONE:
+            briefing_cache.put(window, job.result["briefing"], job.result["pool"])
+            return job.result["briefing"]
+        await asyncio.sleep(QUEUE_POLL_INTERVAL)
+    raise BriefingTimeout(f"Briefing job {job_id} ({window}) did not finish within {BRIEFING_TIMEOUT:g}s")
+
+
+def _briefing_error_text(error: Exception) -> str:
+    if isinstance(error, BriefingQueueFull):
+        return "Too many briefings are being prepared right now. Please try again in a few minutes."
+    if isinstance(error, (BriefingTimeout, asyncio.TimeoutError)):
+        return "Sorry, the news briefing is taking too long. Please try again later."
+    return "Sorry, something went wrong while preparing the news briefing."
+
+
+def personalize(
+    briefing: str, when: datetime, preferences: Preferences | None, pool: list[dict] | None = None
+) -> str:
+    """
+    Returns a chat's briefing: the shared curated briefing without preferences,
+    otherwise its own selection from the article pool (by default that of the
+    window of `when`, which get_briefing has filled). No LLM call is made per
+    chat.
+    """
+    if preferences is None:
+        return briefing
+    if pool is None:
+        pool = briefing_cache.pool(briefing_cache.window_key(when.astimezone(TIMEZONE)))
+    if not pool:
+        return briefing
+    return render_briefing(select_articles(pool, preferences), preferences, when)
+
+
+def _rss_pool() -> list[dict]:
+    import news_feeds  # crewai-free, so queue-mode bots never load the crew stack
+    return news_feeds.rss_pool("global") + news_feeds.rss_pool("korean")
+
+
+async def _degraded_briefing(when: datetime) -> tuple[str, str, list[dict], str] | None:
+    """
+    The best briefing available without the full pipeline: RSS summaries
+    curated locally, else the last cached briefing. Returns its tier, text,
+    article pool (for personalization) and a note for the reader, or None if
+    neither is available.
+    """
+    try:
+        pool = await asyncio.wait_for(asyncio.to_thread(_rss_pool), RSS_FALLBACK_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"RSS-only briefing did not finish within {RSS_FALLBACK_TIMEOUT:g}s")
+        pool = []
+    except Exception:
+        logger.exception("RSS-only briefing failed")
+        pool = []
+    if pool:
+        preferences = Preferences(chat_id=0)
+        text = render_briefing(select_articles(pool, preferences), preferences, when)
+        note = "⏳ Quick briefing from the latest RSS headlines: the full briefing is not ready yet."
+        return RSS, text, pool, note
+
+    entry = briefing_cache.latest()
+    if entry is None:
+        return None
+    created = datetime.fromtimestamp(entry["created_at"], TIMEZONE)
+    note = f"⏳ The new briefing is not ready yet, so here is the previous one from {created:%Y-%m-%d %H:%M}."
+    return CACHED, entry["text"], entry["pool"], note
+
+
+def _seconds_late(slot_time: datetime) -> float:
+    return (datetime.now(slot_time.tzinfo) - slot_time).total_seconds()
+
+
+async def generate_briefing(
+    context: CallbackContext, chat_id: int, on_progress: StageCallback | None = None
+) -> str | None:
+    """
+    Returns the current briefing for one chat, personalized by its preferences.
+    Tells the chat and returns None when the job is rejected, times out or fails.
+    """
+    when = datetime.now(TIMEZONE)
+    try:
+        return personalize(await get_briefing(when, on_progress), when, preference_store.get(chat_id))
+    except Exception as e:
+        logger.exception(f"Briefing for chat_id {chat_id} failed")
+        await context.bot.send_message(chat_id=chat_id, text=_briefing_error_text(e))
+    return None
 
 
 # --- Helper Functions ---
+@lru_cache(maxsize=16)
+def split_message(text: str) -> list[str]:
+    """
+    Splits a long message into chunks of at most MAX_MESSAGE_LENGTH, preferring
+    article boundaries, and adds a page counter (e.g., "(2/5)") when there are several.
+    Cached, so a briefing is chunked once and reused for every recipient.
+    """
+    return chunk_message(text, MAX_MESSAGE_LENGTH)
+
+
+def _progress_message_updater(message: Message) -> StageCallback:
+    """
+    Returns a progress callback that edits message with the stages completed so
+    far. It is called from the crew's worker thread, so edits are handed to the
+    event loop; each edit renders all stages received, so a late edit never
+    shows less than an earlier one.
+    """
+    loop = asyncio.get_running_loop()
+    stages: dict[str, str] = {}
+    lock = asyncio.Lock()
+
+    async def edit():
+        async with lock:
+            try:
+                await message.edit_text(render_progress(dict(stages), MAX_MESSAGE_LENGTH))
+            except BadRequest as e:  # e.g. "Message is not modified"
+                logger.debug(f"Progress edit skipped: {e}")
+            except Exception:
+                logger.exception(f"Failed to update progress in chat_id {message.chat_id}")
+
+    def on_stage(stage: str, text: str):
+        stages[stage] = text
+        asyncio.run_coroutine_threadsafe(edit(), loop)
+
+    return on_stage
+
+
 async def send_long_message(
     context: CallbackContext, chat_id: int, text: str
 ):
+    """Sends a long message in order, split into chunks, through the rate-limited broadcaster."""
+    await broadcaster.send(context.bot, chat_id, split_message(text))
+
+
+async def send_slot_briefings(context: CallbackContext):
     """
-    Splits a long message into chunks of MAX_MESSAGE_LENGTH and sends them sequentially.
-    Adds a page counter (e.g., "(2/5)") to subsequent messages.
+    Callback of a delivery slot's daily job. Gets the slot's briefing once
+    (normally already pre-warmed) and fans it out to every chat subscribed to
+    the slot through the rate-limited broadcaster. Chats are grouped by their
+    preferences, so each distinct briefing is rendered and split only once.
+
+    The full briefing has until BRIEFING_DEADLINE seconds after the slot time.
+    If it is late or fails, the chats get a degraded briefing instead (see
+    _degraded_briefing), while the full one keeps generating in the background
+    and then replaces the degraded messages. Each delivery's tier and lateness
+    are recorded in the delivery log.
     """
-    if len(text) <= MAX_MESSAGE_LENGTH:
-        await context.bot.send_message(chat_id=chat_id, text=text)
+    hour, minute, timezone = context.job.data
+    chat_ids = schedule_store.chat_ids_at(hour, minute, timezone)
+    if not chat_ids:
         return
-
-    parts = []
-    while len(text) > 0:
-        if len(text) > MAX_MESSAGE_LENGTH:
-            part = text[:MAX_MESSAGE_LENGTH]
-            # Find the last newline to avoid cutting words/sentences mid-way
-            last_newline = part.rfind('\n')
-            if last_newline != -1:
-                parts.append(text[:last_newline])
-                text = text[last_newline+1:]
-            else:
-                parts.append(part)
-                text = text[MAX_MESSAGE_LENGTH:]
+    slot = f"{hour:02d}:{minute:02d} ({timezone})"
+    logger.info(f"Executing delivery slot {slot} for {len(chat_ids)} chats")
+
+    slot_time = datetime.now(pytz.timezone(timezone)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    when = datetime.now(TIMEZONE)
+    full = asyncio.ensure_future(get_briefing(when))
+    # At least a moment, so a pre-warmed briefing is served even if this job fired late.
+    budget = max(BRIEFING_DEADLINE - _seconds_late(slot_time), 1)
+    tier, pool, note = FULL, None, ""
+    try:
+        briefing = await asyncio.wait_for(asyncio.shield(full), budget)
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            logger.warning(f"Briefing for slot {slot} missed its {BRIEFING_DEADLINE:g}s deadline")
         else:
-            parts.append(text)
-            break
+            logger.exception(f"Briefing for slot {slot} failed")
+        degraded = await _degraded_briefing(when)
+        if degraded is None:
+            await broadcaster.broadcast(context.bot, chat_ids, [_briefing_error_text(e)])
+            delivery_log.record(slot, ERROR, len(chat_ids), 0, _seconds_late(slot_time))
+            return
+        tier, briefing, pool, note = degraded
+        if not full.done():
+            note += " The full briefing will replace this message when it is ready."
+
+    preferences = preference_store.get_many(chat_ids)
+    groups: dict[tuple | None, list[int]] = {}
+    representatives: dict[tuple | None, Preferences | None] = {}
+    for chat_id in chat_ids:
+        chat_preferences = preferences.get(chat_id)
+        key = chat_preferences.selection_key() if chat_preferences else None
+        groups.setdefault(key, []).append(chat_id)
+        representatives.setdefault(key, chat_preferences)
+    # Message IDs of a degraded delivery, so the full briefing can replace it.
+    sent: dict[int, list[int]] | None = {} if tier != FULL else None
+    broadcasts = []
+    for key, group in groups.items():
+        text = personalize(briefing, when, representatives[key], pool)
+        if note:
+            text = f"{note}\n\n{text}"
+        broadcasts.append(broadcaster.broadcast(context.bot, group, split_message(text), sent))
+    results = await asyncio.gather(*broadcasts)
+    delivered = sum(stats["delivered"] for stats in results)
+    lateness = _seconds_late(slot_time)
+    delivery_id = delivery_log.record(slot, tier, len(chat_ids), delivered, lateness)
+    logger.info(f"Slot {slot} got the {tier} briefing in {delivered}/{len(chat_ids)} chats, {lateness:.0f}s after its time")
+    # exception() raises on a cancelled future, so check cancelled() first.
+    if tier == FULL or (full.done() and (full.cancelled() or full.exception() is not None)):
+        return  # nothing to replace, or the full briefing failed or was cancelled
+
+    async def replace_with_full():
+        try:
+            full_briefing = await full
+        except asyncio.CancelledError:
+            if not full.cancelled():
+                raise  # this task itself was cancelled
+            logger.warning(f"Full briefing for slot {slot} was cancelled; the {tier} briefing stays")
+            return
+        except Exception:
+            logger.exception(f"Full briefing for slot {slot} failed; the {tier} briefing stays")
+            return
+        await asyncio.gather(*(
+            broadcaster.replace_all(
+                context.bot,
+                {chat_id: sent[chat_id] for chat_id in group if sent.get(chat_id)},
+                split_message(personalize(full_briefing, when, representatives[key])),
+            )
+            for key, group in groups.items()
+        ))
+        upgrade_lateness = _seconds_late(slot_time)
+        delivery_log.record_upgrade(delivery_id, upgrade_lateness)
+        logger.info(f"Slot {slot}: {tier} briefing replaced by the full one, {upgrade_lateness:.0f}s after its time")
+
+    context.application.create_task(replace_with_full(), name=f"replace-briefing:{slot}")
+
+
+async def prewarm_slot_briefing(context: CallbackContext):
+    """Generates a slot's briefing BRIEFING_PREWARM_MINUTES ahead so delivery is instant."""
+    hour, minute, timezone = context.job.data
+    if not schedule_store.chat_ids_at(hour, minute, timezone):
+        return
+    slot_time = datetime.now(TIMEZONE) + timedelta(minutes=BRIEFING_PREWARM_MINUTES)
+    logger.info(f"Pre-warming briefing for slot {hour:02d}:{minute:02d} ({timezone})")
+    try:
+        await get_briefing(slot_time)
+    except Exception:
+        logger.exception(f"Pre-warming briefing for slot {hour:02d}:{minute:02d} failed")
 
-    total_parts = len(parts)
-    for i, part in enumerate(parts):
-        message = part
-        if total_parts > 1:
-            message = f"{part}\n\n({i + 1}/{total_parts})"
-        await context.bot.send_message(chat_id=chat_id, text=message)
 
+@lru_cache(maxsize=None)
+def _daily_trigger(hour: int, minute: int, timezone: str) -> CronTrigger:
+    return CronTrigger(hour=hour, minute=minute, timezone=pytz.timezone(timezone))
+
+
+def _slot_job_name(hour: int, minute: int, timezone: str) -> str:
+    return f"slot:{timezone}:{hour:02d}:{minute:02d}"
 
-async def send_scheduled_news(context: CallbackContext):
-    """
-    Callback function executed by the job scheduler.
-    Fetches news and sends it to the specified chat ID.
-    """
-    job = context.job
-    chat_id = job.chat_id
-    logger.info(f"Executing scheduled job for chat_id: {chat_id}")
 
-    await context.bot.send_message(
-        chat_id=chat_id, text="It's the scheduled time! Preparing today's news briefing..."
+# Names of slots that currently have jobs; job_queue.get_jobs_by_name() scans every job.
+_active_slots: set[str] = set()
+
+
+def _ensure_slot_jobs(job_queue, hour: int, minute: int, timezone: str):
+    """Creates the delivery (and pre-warm) jobs of a slot unless they already exist."""
+    name = _slot_job_name(hour, minute, timezone)
+    if name in _active_slots:
+        return
+    _active_slots.add(name)
+    data = (hour, minute, timezone)
+    job_queue.run_custom(
+        send_slot_briefings, job_kwargs={"trigger": _daily_trigger(hour, minute, timezone)}, data=data, name=name
     )
-    news_briefing = kickoff_crew()
-    await send_long_message(context, chat_id, news_briefing)
+    if BRIEFING_PREWARM_MINUTES > 0:
+        prewarm_minute = (hour * 60 + minute - BRIEFING_PREWARM_MINUTES) % (24 * 60)
+        job_queue.run_custom(
+            prewarm_slot_briefing,
+            job_kwargs={"trigger": _daily_trigger(prewarm_minute // 60, prewarm_minute % 60, timezone)},
+            data=data,
+            name=f"prewarm:{name}",
+        )
+
+
+def _remove_slot_jobs_if_empty(job_queue, hour: int, minute: int, timezone: str):
+    """Drops a slot's jobs once its last subscriber is gone."""
+    if schedule_store.chat_ids_at(hour, minute, timezone):
+        return
+    name = _slot_job_name(hour, minute, timezone)
+    _active_slots.discard(name)
+    for job in job_queue.get_jobs_by_name(name) + job_queue.get_jobs_by_name(f"prewarm:{name}"):
+        job.schedule_removal()
+
+
+async def _rehydrate_schedules(application: Application):
+    """Restores one job per stored delivery slot (at most one per minute of the day)."""
+    slots = schedule_store.slots()
+    for hour, minute, timezone in slots:
+        _ensure_slot_jobs(application.job_queue, hour, minute, timezone)
+    logger.info(f"Rehydrated {len(slots)} delivery slots from {BOT_DB_PATH}")
+
+
+async def _post_init(application: Application):
+    await _rehydrate_schedules(application)
+    if CREW_PREWARM:
+        application.create_task(asyncio.to_thread(load_crew_stack), name="crew_prewarm")
 
 
 # --- Command Handlers ---
@@ -100,7 +439,15 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "▪️ /check\n"
         "   Check your currently scheduled briefing time.\n\n"
         "▪️ /cancel\n"
-        "   Cancel your scheduled news briefing."
+        "   Cancel your scheduled news briefing.\n\n"
+        "▪️ /topics Economy Politics\n"
+        "   Only receive some categories (`/topics all` for every category).\n\n"
+        "▪️ /mix 30\n"
+        "   Set the share of global news in percent (the rest is Korean news).\n\n"
+        "▪️ /count 5\n"
+        "   Set how many articles your briefing has.\n\n"
+        "▪️ /prefs\n"
+        "   Show your preferences (`/prefs reset` restores the standard briefing)."
     )
     await update.message.reply_text(help_text)
 
@@ -108,11 +455,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def get_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles the /get command. Fetches and sends news immediately."""
     chat_id = update.effective_chat.id
-    await context.bot.send_message(
+    status = await context.bot.send_message(
         chat_id=chat_id, text="Preparing news briefing. Please wait a moment..."
     )
-    news_briefing = kickoff_crew()
-    await send_long_message(context, chat_id, news_briefing)
+    on_progress = _progress_message_updater(status) if STREAM_BRIEFINGS else None
+    news_briefing = await generate_briefing(context, chat_id, on_progress)
+    if news_briefing is not None:
+        await send_long_message(context, chat_id, news_briefing)
 
 
 async def schedule_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -134,20 +483,12 @@ async def schedule_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Time format is incorrect. Please enter in `HH:MM` format.\nExample: `/schedule 22:30`", parse_mode='Markdown')
         return
     
-    # --- Remove existing jobs to prevent duplicates ---
-    current_jobs = context.job_queue.get_jobs_by_name(str(chat_id))
-    if current_jobs:
-        for job in current_jobs:
-            job.schedule_removal()
-        logger.info(f"Removed {len(current_jobs)} existing jobs for chat_id: {chat_id}")
-
-    # --- Schedule the new job ---
-    context.job_queue.run_daily(
-        send_scheduled_news,
-        time=user_time,
-        chat_id=chat_id,
-        name=str(chat_id)
-    )
+    # --- Move the chat to its new delivery slot ---
+    previous = schedule_store.get(chat_id)
+    schedule_store.upsert(Schedule(chat_id, user_time.hour, user_time.minute, TIMEZONE.zone))
+    _ensure_slot_jobs(context.job_queue, user_time.hour, user_time.minute, TIMEZONE.zone)
+    if previous is not None:
+        _remove_slot_jobs_if_empty(context.job_queue, previous.hour, previous.minute, previous.timezone)
 
     now = datetime.now(TIMEZONE)
     scheduled_dt = now.replace(hour=user_time.hour, minute=user_time.minute, second=0, microsecond=0)
@@ -169,14 +510,16 @@ async def schedule_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def check_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles the /check command. Reports the next scheduled job time."""
     chat_id = update.effective_chat.id
-    current_jobs = context.job_queue.get_jobs_by_name(str(chat_id))
+    schedule = schedule_store.get(chat_id)
 
-    if not current_jobs:
+    if schedule is None:
         await update.message.reply_text("There is no scheduled news briefing.")
         return
 
-    job = current_jobs[0]
-    next_run_time = job.next_run_time.astimezone(TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+    next_run = _daily_trigger(schedule.hour, schedule.minute, schedule.timezone).get_next_fire_time(
+        None, datetime.now(TIMEZONE)
+    )
+    next_run_time = next_run.astimezone(TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
     
     await update.message.reply_text(
         f"🗓️ You have a scheduled briefing.\n"
@@ -187,37 +530,229 @@ async def check_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cancel_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles the /cancel command. Removes the scheduled job."""
     chat_id = update.effective_chat.id
-    current_jobs = context.job_queue.get_jobs_by_name(str(chat_id))
+    schedule = schedule_store.get(chat_id)
 
-    if not current_jobs:
+    if schedule is None or not schedule_store.remove(chat_id):
         await update.message.reply_text("There is no scheduled briefing to cancel.")
         return
 
-    for job in current_jobs:
-        job.schedule_removal()
+    _remove_slot_jobs_if_empty(context.job_queue, schedule.hour, schedule.minute, schedule.timezone)
 
     await update.message.reply_text("✅ All news briefing schedules have been successfully cancelled.")
 
 
-def run_bot():
-    """Starts the bot."""
-    if TELEGRAM_TOKEN == "YOUR_TELEGRAM_BOT_TOKEN":
-        logger.error("Telegram bot token not found. Please set the TELEGRAM_BOT_TOKEN environment variable.")
+def _describe_preferences(preferences: Preferences | None) -> str:
+    if preferences is None:
+        return "You receive the standard curated briefing (all topics, 30% global news, 10 articles)."
+    return (
+        f"Topics: {', '.join(preferences.categories) or 'all'}\n"
+        f"Global news: {preferences.global_share:.0%} (Korean: {1 - preferences.global_share:.0%})\n"
+        f"Articles: {preferences.article_count}"
+    )
+
+
+async def _update_preferences(update: Update, **changes):
+    chat_id = update.effective_chat.id
+    preferences = (preference_store.get(chat_id) or Preferences(chat_id))._replace(**changes)
+    preference_store.upsert(preferences)
+    await update.message.reply_text(f"✅ Preferences updated.\n{_describe_preferences(preferences)}")
+
+
+async def set_topics(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /topics command. Limits the chat's briefing to some categories."""
+    if not context.args:
+        await update.message.reply_text(
+            "Usage: `/topics Economy Politics` to only receive those categories, `/topics all` for every category.",
+            parse_mode='Markdown',
+        )
+        return
+    categories = () if [arg.lower() for arg in context.args] == ["all"] else tuple(dict.fromkeys(context.args))
+    await _update_preferences(update, categories=categories)
+
+
+async def set_mix(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /mix command. Sets the share of global (vs. Korean) news."""
+    try:
+        percent = int(context.args[0].rstrip("%")) if len(context.args or []) == 1 else -1
+    except ValueError:
+        percent = -1
+    if not 0 <= percent <= 100:
+        await update.message.reply_text(
+            "Usage: `/mix 30` for 30% global and 70% Korean news (0-100).", parse_mode='Markdown'
+        )
+        return
+    await _update_preferences(update, global_share=percent / 100)
+
+
+async def set_count(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /count command. Sets how many articles the briefing has."""
+    try:
+        count = int(context.args[0]) if len(context.args or []) == 1 else 0
+    except ValueError:
+        count = 0
+    if not 1 <= count <= MAX_ARTICLE_COUNT:
+        await update.message.reply_text(
+            f"Usage: `/count 5` for a briefing of 5 articles (1-{MAX_ARTICLE_COUNT}).", parse_mode='Markdown'
+        )
+        return
+    await _update_preferences(update, article_count=count)
+
+
+async def show_preferences(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /prefs command. Shows the chat's preferences, or resets them with `/prefs reset`."""
+    chat_id = update.effective_chat.id
+    if context.args and context.args[0].lower() == "reset":
+        preference_store.remove(chat_id)
+        await update.message.reply_text(f"✅ Preferences reset.\n{_describe_preferences(None)}")
+        return
+    await update.message.reply_text(_describe_preferences(preference_store.get(chat_id)))
+
+
+async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /stats admin command. Reports the last run's timing and cache breakdown."""
+    chat_id = update.effective_chat.id
+    if chat_id not in ADMIN_CHAT_IDS:
+        await update.message.reply_text("This command is only available to administrators.")
+        return
+
+    # Runs may happen in worker processes (BRIEFING_QUEUE=1), so the last run
+    # is read from the metrics they export rather than from this process.
+    last_run = await asyncio.to_thread(metrics.read_last_run, DATA_DIR)
+    cache_stats = briefing_cache.stats()
+    lines = [
+        f"Briefing cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate)",
+        *_llm_cache_lines(last_run),
+        f"Pending briefing jobs: {(briefing_queue or briefing_executor).pending()}",
+        "Delivery: " + ", ".join(f"{name}={value}" for name, value in broadcaster.stats().items()),
+        *_delivery_lines(),
+        "",
+        metrics.run_summary(last_run) if last_run else "No briefing run has finished yet.",
+    ]
+    await send_long_message(context, chat_id, "\n".join(lines))
+
+
+def _llm_cache_lines(last_run: dict | None) -> list[str]:
+    if not last_run:
+        return []
+    lookups = {"hit": 0, "similar_hit": 0, "miss": 0}
+    for counter in last_run["counters"]:
+        result = counter["labels"].get("result")
+        if counter["name"] == "llm_cache" and result in lookups:
+            lookups[result] += counter["value"]
+    total = sum(lookups.values())
+    hit_rate = (lookups["hit"] + lookups["similar_hit"]) / total if total else 0.0
+    return [
+        f"LLM cache (last run): {lookups['hit']:g} hits / {lookups['similar_hit']:g} similar / "
+        f"{lookups['miss']:g} misses ({hit_rate:.0%} hit rate)"
+    ]
+
+
+def _delivery_lines() -> list[str]:
+    deliveries = delivery_log.recent(5)
+    if not deliveries:
+        return []
+    lines = ["Recent slot deliveries (tier, seconds after the slot time):"]
+    for delivery in deliveries:
+        line = (
+            f"- {datetime.fromtimestamp(delivery.created_at, TIMEZONE):%m-%d %H:%M} {delivery.slot}: {delivery.tier}, "
+            f"{delivery.lateness:.0f}s late, {delivery.delivered}/{delivery.chats} chats"
+        )
+        if delivery.upgrade_lateness is not None:
+            line += f", replaced by the full briefing {delivery.upgrade_lateness:.0f}s late"
+        lines.append(line)
+    return lines
+
+
+def _ago(timestamp: float | None) -> str:
+    if timestamp is None:
+        return "never"
+    minutes = int((datetime.now().timestamp() - timestamp) // 60)
+    return f"{minutes // 60}h {minutes % 60}m ago" if minutes >= 60 else f"{minutes}m ago"
+
+
+def _feed_health_lines() -> list[str]:
+    # Read from the files the fetchers persist, which may run in worker processes.
+    health = FeedHealth(os.path.join(DATA_DIR, "feed_health.json")).snapshot()
+    lines = []
+    for source in FeedRegistry(FEEDS_CONFIG).sources():
+        entry = health.get(source.name)
+        if entry is None:
+            lines.append(f"⚪ {source.name} ({source.region}): not fetched yet")
+            continue
+        icon = {"closed": "✅", "half_open": "🟡", "open": "⛔"}[entry["state"]]
+        latency = f"{entry['p50_latency']:.2f}s" if entry["p50_latency"] is not None else "-"
+        line = (
+            f"{icon} {source.name} ({source.region}): {entry['state']}, "
+            f"{entry['error_rate']:.0%} errors, p50 {latency}, last success {_ago(entry['last_success'])}"
+        )
+        if entry["open_until"]:
+            line += f", retried in {max(int(entry['open_until'] - datetime.now().timestamp()) // 60, 0)}m"
+        if entry["last_error"]:
+            line += f"\n    last error {_ago(entry['last_error_at'])}: {entry['last_error']}"
+        lines.append(line)
+    return lines
+
+
+async def show_health(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /health admin command. Reports each feed's circuit breaker, error rate and latency."""
+    chat_id = update.effective_chat.id
+    if chat_id not in ADMIN_CHAT_IDS:
+        await update.message.reply_text("This command is only available to administrators.")
         return
 
+    lines = ["Feed health (error rate and p50 latency over the last 20 fetches):", *_feed_health_lines()]
+    await send_long_message(context, chat_id, "\n".join(lines))
+
+
+async def _shutdown_resources(application: Application):
+    """Stops the briefing executor and closes the bot's stores."""
+    briefing_executor.shutdown()
+    schedule_store.close()
+    preference_store.close()
+    delivery_log.close()
+    if briefing_queue is not None:
+        briefing_queue.close()
+
+
+def build_application(token: str) -> Application:
+    """Builds the Telegram application with every command handler registered."""
     handlers = [
         CommandHandler("start", start),
         CommandHandler("get", get_news),
         CommandHandler("schedule", schedule_news),
         CommandHandler("check", check_schedule),
         CommandHandler("cancel", cancel_schedule),
+        CommandHandler("topics", set_topics),
+        CommandHandler("mix", set_mix),
+        CommandHandler("count", set_count),
+        CommandHandler("prefs", show_preferences),
+        CommandHandler("stats", show_stats),
+        CommandHandler("health", show_health),
     ]
 
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+    # Updates are handled concurrently so /start, /check and /cancel answer
+    # immediately while /get is waiting on the briefing executor.
+    application = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(True)
+        .post_init(_post_init)
+        .post_shutdown(_shutdown_resources)
+        .build()
+    )
 
     # --- Register Command Handlers ---
     for handler in handlers:
         application.add_handler(handler)
+    return application
+
+
+def run_bot():
+    """Starts the bot."""
+    if TELEGRAM_TOKEN == "YOUR_TELEGRAM_BOT_TOKEN":
+        logger.error("Telegram bot token not found. Please set the TELEGRAM_BOT_TOKEN environment variable.")
+        return
 
-    application.run_polling()
+    build_application(TELEGRAM_TOKEN).run_polling()
 
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+from storage import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+
+class BriefingCache:
+    """
+    Briefings shared by all chats, keyed by time window (e.g. "2025-10-08T08:00"
+    for a 60-minute window). Entries expire after ttl seconds and are persisted
+    to a JSON file so a restart keeps serving the current window's briefing.
+    Each entry also keeps the window's pool of edited articles, from which
+    personalized briefings are selected.
+    """
+
+    def __init__(self, path: str, window_minutes: int = 60, ttl: float = 3600):
+        self.path = path
+        self.window_minutes = window_minutes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = read_json(path, default={})
+
+    def window_key(self, now: datetime) -> str:
+        """Returns the key of the time window that now falls into."""
+        minute_of_day = now.hour * 60 + now.minute
+        start = minute_of_day - minute_of_day % self.window_minutes
+        return f"{now:%Y-%m-%d}T{start // 60:02d}:{start % 60:02d}"
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached briefing for a window and counts the hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["created_at"] < self.ttl:
+                self.hits += 1
+                return entry["text"]
+            self.misses += 1
+            return None
+
+    def pool(self, key: str) -> list[dict]:
+        """Returns the edited-article pool of a cached window (empty if unknown or expired)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry["created_at"] >= self.ttl:
+                return []
+            return entry.get("pool", [])
+
+    def latest(self) -> dict | None:
+        """
+        Returns the most recently stored entry (text, pool and created_at), even
+        if it has expired: the last resort when no current briefing can be made.
+        """
+        with self._lock:
+            return max(self._entries.values(), key=lambda entry: entry["created_at"], default=None)
+
+    def put(self, key: str, text: str, pool: list[dict] | None = None):
+        """Stores a briefing and its article pool, drops expired windows and persists the cache."""
+        now = time.time()
+        with self._lock:
+            self._entries = {
+                k: v for k, v in self._entries.items() if now - v["created_at"] < self.ttl
+            }
+            self._entries[key] = {"text": text, "pool": pool or [], "created_at": now}
+            try:
+                atomic_write_json(self.path, self._entries)
+            except OSError as e:
+                logger.warning(f"Could not persist briefing cache to {self.path}: {e}")
+
+    def stats(self) -> dict[str, float]:
+        """Returns hit/miss counters and the hit rate since startup."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BriefingQueueFull(Exception):
+    """Raised when the executor already holds the maximum number of pending jobs."""
+
+
+class BriefingTimeout(Exception):
+    """Raised when a caller stops waiting for a job that exceeded its timeout."""
+
+
+class BriefingExecutor:
+    """
+    Runs blocking briefing jobs (crew kickoffs) on a bounded worker pool so the
+    Telegram event loop keeps answering other chats while a briefing is generated.
+
+    Jobs are registered under a key while they are in flight; submitting the same
+    key again returns the running job instead of starting a second one.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, timeout: float = 900):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="briefing")
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """Schedules fn(*args) under key, or returns the job already running under it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                logger.info(f"Joining in-flight briefing job: {key}")
+                return future
+
+            # --- Backpressure: queued + running jobs are capped ---
+            if len(self._inflight) >= self.max_pending:
+                raise BriefingQueueFull(
+                    f"{len(self._inflight)} briefing jobs pending (limit {self.max_pending})"
+                )
+
+            future = self._pool.submit(fn, *args)
+            self._inflight[key] = future
+            logger.info(f"Submitted briefing job: {key} ({len(self._inflight)} pending)")
+
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    async def run(self, key: str, fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+        """
+        Submits a job and awaits its result without blocking the event loop.
+        A timeout only stops this caller from waiting; the worker thread finishes
+        the job and keeps its pending slot until then.
+        """
+        future = self.submit(key, fn, *args)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            raise BriefingTimeout(f"Briefing job {key} did not finish within {timeout:g}s")
+
+    def pending(self) -> int:
+        """Returns the number of queued and running jobs."""
+        with self._lock:
+            return len(self._inflight)
+
+    def shutdown(self):
+        """Drops queued jobs and stops accepting new ones."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _forget(self, key: str, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,205 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, NamedTuple
+
+from briefing_executor import BriefingQueueFull
+
+LEASE_SECONDS = 120  # a worker must renew its lease within this long
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 30  # seconds before a failed job is retried, doubled per attempt
+JOB_RETENTION = 24 * 3600  # seconds finished jobs are kept
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class BriefingJobFailed(Exception):
+    """Raised to the waiting bot when a job failed on its last attempt."""
+
+
+class Job(NamedTuple):
+    id: int
+    key: str
+    status: str
+    attempts: int
+    result: Any
+    error: str | None
+
+
+class BriefingQueue:
+    """
+    Durable queue of briefing jobs in SQLite, shared by the bot process and
+    the worker processes on one machine.
+
+    The bot enqueues one job per key (cache window); enqueueing a key that is
+    already queued or running returns the existing job. A worker leases a job
+    for lease_seconds and renews the lease while it works, then completes or
+    fails it. A failed job is queued again with exponential backoff until it
+    has used max_attempts. When a worker dies, its lease expires and another
+    worker takes the job over, which counts as an attempt. Every transition
+    runs in an immediate transaction, so concurrent processes never lease the
+    same job.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_backoff: float = RETRY_BACKOFF,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_until REAL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE takes SQLite's write lock up front, so read-then-write steps are atomic across processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, key: str, max_pending: int | None = None) -> int:
+        """
+        Queues a job for key unless one is already queued or running; returns its
+        id. Raises BriefingQueueFull if max_pending jobs are already waiting.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY id DESC LIMIT 1",
+                (key, QUEUED, LEASED),
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            if max_pending is not None:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, LEASED)
+                ).fetchone()[0]
+                if pending >= max_pending:
+                    raise BriefingQueueFull(f"{pending} briefing jobs queued (limit {max_pending})")
+            return conn.execute(
+                "INSERT INTO jobs (key, status, available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, QUEUED, now, now, now),
+            ).lastrowid
+
+    def lease(self, worker_id: str) -> Job | None:
+        """
+        Leases the oldest runnable job to worker_id: a queued job whose backoff
+        has passed, or a running job whose lease expired (its worker died).
+        Expired jobs without attempts left are failed instead.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(error, 'lease expired'), lease_owner = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (QUEUED, now, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ?",
+                (LEASED, worker_id, now + self.lease_seconds, now, row[0]),
+            )
+        return self.get(row[0])
+
+    def renew(self, job_id: int, worker_id: str) -> bool:
+        """Extends a lease; returns False if the worker no longer holds it."""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + self.lease_seconds, now, job_id, LEASED, worker_id),
+            ).rowcount > 0
+
+    def complete(self, job_id: int, worker_id: str, result: Any) -> bool:
+        """Stores a job's JSON result; returns False (and stores nothing) if the lease was lost."""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), now, job_id, LEASED, worker_id),
+            ).rowcount > 0
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Queues a failed job for a retry after its backoff, or fails it for good after max_attempts."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?", (job_id, LEASED, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts = row[0]
+            status = QUEUED if attempts < self.max_attempts else FAILED
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, available_at = ?, updated_at = ? WHERE id = ?",
+                (status, error[:1000], now + self.retry_backoff * 2 ** (attempts - 1), now, job_id),
+            )
+            return True
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, key, status, attempts, result, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, key, status, attempts, result, error = row
+        return Job(job_id, key, status, attempts, json.loads(result) if result is not None else None, error)
+
+    def pending(self) -> int:
+        """Returns the number of queued and running jobs."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, LEASED)).fetchone()[0]
+
+    def purge(self, max_age: float = JOB_RETENTION) -> int:
+        """Deletes finished jobs older than max_age seconds; returns how many."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, time.time() - max_age)
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
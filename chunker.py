@@ -0,0 +1,131 @@
+import bisect
+import re
+import unicodedata
+
+# Minimum fraction of the limit a chunk must fill before a lower-priority break is
+# preferred over a higher-priority one further back.
+MIN_FILL = 0.5
+# Room kept free in every chunk for the "\n\n(12/34)" page counter.
+PAGE_COUNTER_RESERVE = 16
+
+# Break points of the curator's report, best first. Each match is the whitespace
+# removed between two chunks; the first matching alternative names its priority.
+_BREAKS = re.compile(
+    r"""
+      (?P<article>
+          \n+(?=\[\d+\]\s)          # before an "[n] ..." article block
+        | (?<=─{3})\n+              # after a ──── separator line
+        | \n(?:[ \t]*\n)+(?==+\n)   # before a ==== section header
+      )
+    | (?P<paragraph>\n(?:[ \t]*\n)+)
+    | (?P<line>\n)
+    | (?P<sentence>(?<=[.!?。])[ \t]+)
+    | (?P<word>[ \t]+)
+    """,
+    re.VERBOSE,
+)
+_PRIORITIES = ("article", "paragraph", "line", "sentence", "word")
+_URL = re.compile(r"https?://\S+")
+
+_ZWJ = "\u200d"
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return "\U0001F1E6" <= char <= "\U0001F1FF"
+
+
+def _inside_grapheme(text: str, pos: int) -> bool:
+    """Whether cutting text at pos would split a grapheme cluster (approximation of UAX #29)."""
+    before, after = text[pos - 1], text[pos]
+    if before == "\r" and after == "\n":
+        return True
+    if before == _ZWJ or after == _ZWJ:
+        return True
+    if unicodedata.combining(after) or unicodedata.category(after) in ("Mn", "Mc", "Me"):
+        return True
+    if "\ufe00" <= after <= "\ufe0f" or "\U0001F3FB" <= after <= "\U0001F3FF" or "\U000E0020" <= after <= "\U000E007F":
+        return True
+    if "\u1160" <= after <= "\u11ff":  # Hangul conjoining vowel/final jamo
+        return True
+    if _is_regional_indicator(before) and _is_regional_indicator(after):
+        # Flags are pairs of regional indicators; only cut between pairs.
+        run = 0
+        while pos - run - 1 >= 0 and _is_regional_indicator(text[pos - run - 1]):
+            run += 1
+        return run % 2 == 1
+    return False
+
+
+def chunk_text(text: str, limit: int) -> list[str]:
+    """
+    Splits text into chunks of at most limit characters in one linear pass.
+
+    Break points are found with a single regex scan and kept as offsets; the
+    text is only sliced to produce the chunks themselves. Each chunk ends at
+    the last article boundary inside the limit, else the last paragraph, line,
+    sentence or word break (each only if the chunk stays at least MIN_FILL
+    full). Text without any break is hard-cut, but never inside a URL or a
+    grapheme cluster.
+    """
+    breaks: dict[str, list[tuple[int, int]]] = {name: [] for name in _PRIORITIES}
+    for match in _BREAKS.finditer(text):
+        breaks[match.lastgroup].append(match.span())
+    break_starts = {name: [start for start, _ in spans] for name, spans in breaks.items()}
+    urls = [match.span() for match in _URL.finditer(text)]
+    url_starts = [start for start, _ in urls]
+
+    # Per priority, the number of breaks starting at or before the current window end.
+    # Window ends only move forward, so these cursors make the scan linear overall.
+    cursors = dict.fromkeys(_PRIORITIES, 0)
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        while start < length and text[start] in "\r\n":
+            start += 1
+        if length - start <= limit:
+            if start < length:
+                chunks.append(text[start:].rstrip())
+            break
+
+        end = start + limit
+        min_end = start + int(limit * MIN_FILL)
+        cut = resume = None
+        for name in _PRIORITIES:
+            starts = break_starts[name]
+            while cursors[name] < len(starts) and starts[cursors[name]] <= end:
+                cursors[name] += 1
+            index = cursors[name] - 1
+            if index >= 0 and starts[index] > min_end:
+                cut, resume = breaks[name][index]
+                break
+
+        if cut is None:
+            cut = end
+            url_index = bisect.bisect_right(url_starts, cut) - 1
+            if url_index >= 0 and urls[url_index][0] < cut < urls[url_index][1] and urls[url_index][0] > start:
+                cut = urls[url_index][0]
+            while cut > start + 1 and _inside_grapheme(text, cut):
+                cut -= 1
+            resume = cut
+
+        chunk = text[start:cut].rstrip()
+        if chunk:
+            chunks.append(chunk)
+        start = resume
+    return chunks
+
+
+def paginate(chunks: list[str]) -> list[str]:
+    """Adds a "(i/n)" page counter to every chunk when there is more than one."""
+    if len(chunks) <= 1:
+        return chunks
+    total = len(chunks)
+    return [f"{chunk}\n\n({i + 1}/{total})" for i, chunk in enumerate(chunks)]
+
+
+def chunk_message(text: str, limit: int) -> list[str]:
+    """Splits a message into paginated chunks that each fit within limit characters."""
+    if len(text) <= limit:
+        return [text]
+    return paginate(chunk_text(text, limit - PAGE_COUNTER_RESERVE))
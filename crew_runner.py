@@ -0,0 +1,70 @@
+"""
+Runs the news crew. Shared by the bot (in-process generation) and the
+briefing workers (worker.py); it does not depend on Telegram.
+"""
+import logging
+import os
+import threading
+from time import perf_counter
+from types import ModuleType
+
+import env  # loads .env before the configuration below is read
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+_crew_stack: tuple[ModuleType, ModuleType] | None = None
+_crew_stack_lock = threading.Lock()
+
+
+def load_crew_stack() -> tuple[ModuleType, ModuleType]:
+    """
+    Imports the news_crew and tool modules on first use and returns them.
+    Together with crewai, litellm and the tools' stores they take seconds to
+    load, so the bot does not import them at startup: the bot's poller
+    answers /start right away while they load in the background (see
+    CREW_PREWARM in bot.py).
+    Blocks until loaded; call it off the event loop.
+    """
+    global _crew_stack
+    with _crew_stack_lock:
+        if _crew_stack is None:
+            started = perf_counter()
+            import news_crew
+            import tool
+            _crew_stack = (news_crew, tool)
+            logger.info(f"Crew stack loaded in {perf_counter() - started:.2f}s")
+    return _crew_stack
+
+
+def kickoff_crew(task_callback=None) -> tuple[str, list[dict]]:
+    """
+    Runs the news crew and returns the curated briefing together with the pool
+    of edited articles it was selected from (the editor task's validated
+    output), from which personalized briefings are built without further LLM
+    calls.
+    """
+    from task_outputs import output_articles
+
+    metrics.install_crewai_listeners()
+    metrics.start_run()
+    try:
+        with metrics.timer("crew_kickoff"):
+            news_crew, _ = load_crew_stack()
+            crew = news_crew.NewsCrew().crew(task_callback=task_callback)
+            result = crew.kickoff()
+        metrics.record_token_usage(crew)
+        pool = next(
+            (output_articles(task.output) for task in crew.tasks if task.name == "edit_and_summarize_articles_task"),
+            [],
+        )
+        return result.raw, pool
+    finally:
+        run = metrics.finish_run(DATA_DIR)
+        if run is not None:
+            logger.info(
+                f"Briefing run finished in {run.wall_time:.1f}s, "
+                f"~{run.total('prompt_tokens_saved'):.0f} prompt tokens saved by trimmed prompts"
+            )
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly 30 messages/second overall and about 1/second per chat.
+GLOBAL_RATE = 25  # messages per second
+PER_CHAT_RATE = 1  # messages per second
+PER_CHAT_BURST = 3
+CONCURRENCY = 50  # chats being sent to at once during a broadcast
+MAX_RETRIES = 4
+MAX_CHAT_BUCKETS = 1000  # per-chat buckets kept between sends, beyond which idle ones are dropped
+BACKOFF_BASE = 0.5  # seconds, doubled per retry
+
+
+class TokenBucket:
+    """Async token bucket: acquire() waits until one token is available."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.users = 0  # requests currently holding the bucket
+
+    def idle(self) -> bool:
+        """Whether no request holds the bucket and it has refilled, so a new bucket would behave the same."""
+        tokens = self._tokens + (time.monotonic() - self._updated) * self.rate
+        return self.users == 0 and tokens >= self.capacity
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Broadcaster:
+    """
+    Sends message chunks through Telegram within its rate limits.
+
+    Every send passes a per-chat and a global token bucket. Chunks for one chat
+    go out strictly in order, while broadcast() fans out across chats
+    concurrently. RetryAfter (429) pauses all sending for the requested time;
+    timeouts and network errors are retried with exponential backoff; blocked
+    chats and bad requests fail the chat immediately.
+
+    Messages sent by send() and broadcast() can later be replaced in place
+    with other chunks (replace() and replace_all()), e.g. when a degraded
+    briefing is followed by the full one.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        per_chat_rate: float = PER_CHAT_RATE,
+        per_chat_burst: float = PER_CHAT_BURST,
+        concurrency: int = CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        max_chat_buckets: int = MAX_CHAT_BUCKETS,
+    ):
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.max_chat_buckets = max_chat_buckets
+        self._global = TokenBucket(global_rate, global_rate)
+        # Least recently used first. Buckets outlive a send, so the per-chat
+        # limit also holds across sends, e.g. a degraded briefing and its
+        # replacement, or a broadcast and a /get reply.
+        self._chat_buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._paused_until = 0.0
+        self.counters = {
+            "messages_sent": 0, "messages_edited": 0, "retries": 0, "rate_limited": 0, "chats_failed": 0
+        }
+
+    async def send(self, bot: Any, chat_id: int, chunks: list[str], sent: list[int] | None = None) -> bool:
+        """
+        Sends chunks to one chat in order; returns False if the chat could not be
+        reached. The IDs of the messages sent are appended to sent.
+        """
+        try:
+            for chunk in chunks:
+                message = await self._send_one(bot, chat_id, chunk)
+                if sent is not None:
+                    sent.append(message.message_id)
+            return True
+        except Exception as e:
+            self.counters["chats_failed"] += 1
+            logger.warning(f"Delivery to chat_id {chat_id} failed: {e}")
+            return False
+
+    async def replace(self, bot: Any, chat_id: int, message_ids: list[int], chunks: list[str]) -> bool:
+        """
+        Replaces earlier messages of a chat with chunks: the messages are edited
+        in order, chunks beyond them are sent as new messages and messages
+        beyond the chunks are deleted. Returns False if the chat could not be
+        reached.
+        """
+        try:
+            for message_id, chunk in zip(message_ids, chunks):
+                await self._edit_one(bot, chat_id, message_id, chunk)
+            for chunk in chunks[len(message_ids):]:
+                await self._send_one(bot, chat_id, chunk)
+            for message_id in message_ids[len(chunks):]:
+                await self._call(chat_id, lambda: bot.delete_message(chat_id=chat_id, message_id=message_id))
+            return True
+        except Exception as e:
+            self.counters["chats_failed"] += 1
+            logger.warning(f"Replacing messages in chat_id {chat_id} failed: {e}")
+            return False
+
+    async def broadcast(
+        self, bot: Any, chat_ids: list[int], chunks: list[str], sent: dict[int, list[int]] | None = None
+    ) -> dict[str, float]:
+        """
+        Sends the same chunks to many chats concurrently and returns delivery
+        stats. sent, if given, receives each chat's message IDs.
+        """
+        def send(chat_id: int) -> Awaitable[bool]:
+            return self.send(bot, chat_id, chunks, sent.setdefault(chat_id, []) if sent is not None else None)
+
+        return await self._fan_out(chat_ids, send)
+
+    async def replace_all(self, bot: Any, sent: dict[int, list[int]], chunks: list[str]) -> dict[str, float]:
+        """Replaces the messages recorded by broadcast() with chunks in every chat and returns delivery stats."""
+        return await self._fan_out(
+            list(sent), lambda chat_id: self.replace(bot, chat_id, sent[chat_id], chunks)
+        )
+
+    async def _fan_out(self, chat_ids: list[int], deliver: Callable[[int], Awaitable[bool]]) -> dict[str, float]:
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver_bounded(chat_id: int) -> bool:
+            async with semaphore:
+                return await deliver(chat_id)
+
+        results = await asyncio.gather(*(deliver_bounded(chat_id) for chat_id in chat_ids))
+        stats = {
+            "chats": len(chat_ids),
+            "delivered": sum(results),
+            "failed": len(results) - sum(results),
+            "seconds": round(time.monotonic() - started, 2),
+        }
+        logger.info(f"Broadcast finished: {stats}")
+        return stats
+
+    def stats(self) -> dict[str, int]:
+        return dict(self.counters)
+
+    async def _send_one(self, bot: Any, chat_id: int, text: str) -> Any:
+        message = await self._call(chat_id, lambda: bot.send_message(chat_id=chat_id, text=text))
+        self.counters["messages_sent"] += 1
+        return message
+
+    async def _edit_one(self, bot: Any, chat_id: int, message_id: int, text: str):
+        try:
+            await self._call(chat_id, lambda: bot.edit_message_text(text, chat_id=chat_id, message_id=message_id))
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise
+        self.counters["messages_edited"] += 1
+
+    async def _call(self, chat_id: int, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Makes one Bot API request for a chat within the rate limits, retrying as described above."""
+        bucket = self._chat_bucket(chat_id)
+        bucket.users += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                await bucket.acquire()
+                await self._global.acquire()
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                try:
+                    return await request()
+                except RetryAfter as e:
+                    retry_after = e.retry_after
+                    seconds = retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+                    self.counters["rate_limited"] += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+                    logger.warning(f"Rate limited by Telegram, pausing sends for {seconds:g}s")
+                    error = e
+                except (Forbidden, BadRequest):
+                    raise
+                except NetworkError as e:
+                    await asyncio.sleep(BACKOFF_BASE * 2 ** attempt * (1 + random.random() / 2))
+                    error = e
+                self.counters["retries"] += 1
+            raise error
+        finally:
+            bucket.users -= 1
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        """
+        The chat's token bucket, created on first use. Beyond max_chat_buckets,
+        the least recently used buckets are dropped as long as they are idle.
+        """
+        bucket = self._chat_buckets.pop(chat_id, None) or TokenBucket(self.per_chat_rate, self.per_chat_burst)
+        self._chat_buckets[chat_id] = bucket
+        while len(self._chat_buckets) > self.max_chat_buckets:
+            oldest_id, oldest = next(iter(self._chat_buckets.items()))
+            if oldest is bucket or not oldest.idle():
+                break
+            del self._chat_buckets[oldest_id]
+        return bucket
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+# Briefing tiers, best first: the crew's full briefing, a briefing of RSS
+# summaries curated locally, and the last cached briefing. ERROR: the chats
+# only got an error message.
+FULL, RSS, CACHED, ERROR = "full", "rss", "cached", "error"
+
+
+class Delivery(NamedTuple):
+    id: int
+    slot: str  # e.g. "08:00 (Europe/Berlin)"
+    tier: str
+    chats: int
+    delivered: int
+    lateness: float  # seconds after the slot time when the last chat was sent to
+    upgrade_lateness: float | None  # the same for the full briefing that replaced a degraded one
+    created_at: float
+
+
+class DeliveryLog:
+    """
+    Record of scheduled deliveries in SQLite: which tier each delivery slot
+    was served and how late, and when a degraded briefing was replaced by the
+    full one.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                slot TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                chats INTEGER NOT NULL,
+                delivered INTEGER NOT NULL,
+                lateness REAL NOT NULL,
+                upgrade_lateness REAL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def record(self, slot: str, tier: str, chats: int, delivered: int, lateness: float) -> int:
+        """Records a slot's delivery and returns its id."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "INSERT INTO deliveries (slot, tier, chats, delivered, lateness, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (slot, tier, chats, delivered, lateness, time.time()),
+            ).lastrowid
+
+    def record_upgrade(self, delivery_id: int, lateness: float):
+        """Records when the full briefing replaced a degraded delivery."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE deliveries SET upgrade_lateness = ? WHERE id = ?", (lateness, delivery_id))
+
+    def recent(self, limit: int = 10) -> list[Delivery]:
+        """Returns the latest deliveries, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, slot, tier, chats, delivered, lateness, upgrade_lateness, created_at "
+                "FROM deliveries ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [Delivery(*row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any
+
+from storage import atomic_write_json, read_json
+
+STALE_MAX_AGE = 6 * 3600  # seconds a failing feed may keep serving its last entries
+
+
+class FeedCache:
+    """
+    Per-URL store of validators (ETag / Last-Modified) and already-parsed entries.
+
+    The fetcher sends the validators as a conditional GET and reuses the parsed
+    entries on 304. When a feed fails, entries younger than max_stale_age are
+    served instead (stale-while-revalidate). The cache is persisted as one JSON
+    file and written once per fetch round via flush().
+    """
+
+    def __init__(self, path: str, max_stale_age: float = STALE_MAX_AGE):
+        self.path = path
+        self.max_stale_age = max_stale_age
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = read_json(path, default={})
+        self._dirty = False
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Returns If-None-Match / If-Modified-Since headers for a cached URL."""
+        with self._lock:
+            entry = self._entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url: str) -> list[Any] | None:
+        """Marks a cached feed as confirmed unchanged (304) and returns its entries."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            entry["fetched_at"] = time.time()
+            self._dirty = True
+            return entry["items"]
+
+    def fresh(self, url: str, max_age: float) -> list[Any] | None:
+        """Returns the entries of a feed fetched (or revalidated) within the last max_age seconds."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None or time.time() - entry["fetched_at"] > max_age:
+            return None
+        return entry["items"]
+
+    def stale(self, url: str) -> list[Any] | None:
+        """Returns the last good entries of a feed if they are recent enough to serve."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None or time.time() - entry["fetched_at"] > self.max_stale_age:
+            return None
+        return entry["items"]
+
+    def put(self, url: str, items: list[Any], etag: str | None, last_modified: str | None):
+        """Stores freshly parsed entries with the validators from the response."""
+        with self._lock:
+            self._entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+                "items": items,
+            }
+            self._dirty = True
+
+    def flush(self):
+        """Persists the cache if anything changed since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            atomic_write_json(self.path, self._entries)
+            self._dirty = False
@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from feed_cache import FeedCache
+from feed_health import FeedHealth
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 2
+CONNECT_TIMEOUT = 3.05  # seconds
+READ_TIMEOUT = 10  # seconds
+TOTAL_DEADLINE = 20  # seconds for a whole fetch_all() call
+USER_AGENT = "Mozilla/5.0 (compatible; NewsBriefingBot/0.1)"
+
+
+class FeedFetcher:
+    """
+    Fetches many feeds concurrently over one pooled keep-alive session.
+
+    Each request has connect/read timeouts, each host gets at most
+    per_host_limit concurrent requests, and fetch_all() returns whatever has
+    finished when the total deadline passes. With a FeedCache, requests are
+    conditional and failing or late feeds fall back to their last good entries.
+    Responses are streamed to parse(), which may stop reading early.
+
+    With a FeedHealth, every fetch is recorded per source and sources whose
+    circuit breaker is open are not requested; they are served from the cache
+    like a failed feed.
+    """
+
+    def __init__(
+        self,
+        cache: FeedCache | None = None,
+        health: FeedHealth | None = None,
+        max_workers: int = MAX_WORKERS,
+        per_host_limit: int = PER_HOST_LIMIT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        deadline: float = TOTAL_DEADLINE,
+    ):
+        self.cache = cache
+        self.health = health
+        self.per_host_limit = per_host_limit
+        self.timeout = (connect_timeout, read_timeout)
+        self.deadline = deadline
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed")
+        self._host_limits: dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def fetch_all(
+        self,
+        sources: dict[str, str],
+        parse: Callable[[str, requests.Response], list[Any]],
+        deadline: float | None = None,
+        intervals: dict[str, float] | None = None,
+    ) -> list[Any]:
+        """
+        Fetches every source URL concurrently and runs parse(source_name, response)
+        on each successful response. Results keep the order of sources; sources
+        that fail or miss the deadline are skipped. A source with an interval
+        (seconds) that was fetched more recently than that reuses its cached
+        entries without a request.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        intervals = intervals or {}
+        started = time.monotonic()
+        results: dict[str, list[Any]] = {}
+        futures: dict[Future, str] = {}
+        for name, url in sources.items():
+            if self.cache is not None and intervals.get(name):
+                items = self.cache.fresh(url, intervals[name])
+                if items is not None:
+                    metrics.incr("feed_cache", result="fresh")
+                    results[name] = items
+                    continue
+            if self.health is not None and not self.health.allow(name):
+                logger.info(f"Circuit breaker open for {name}, not fetching it")
+                self._use_stale(results, name, url)
+                continue
+            futures[self._pool.submit(metrics.propagate(self._fetch_one), name, url, parse)] = name
+
+        pending = set(futures)
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    results[name], seconds = future.result()
+                except Exception as e:
+                    logger.warning(f"Error fetching RSS from {name}: {e}")
+                    if self.health is not None:
+                        self.health.record_failure(name, f"{type(e).__name__}: {e}")
+                    self._use_stale(results, name, sources[name])
+                else:
+                    if self.health is not None:
+                        self.health.record_success(name, seconds)
+
+        for future in pending:
+            future.cancel()
+            name = futures[future]
+            logger.warning(f"Deadline of {deadline:g}s passed before {name} finished")
+            if self.health is not None:
+                self.health.record_failure(name, f"missed the {deadline:g}s deadline", deadline)
+            self._use_stale(results, name, sources[name])
+
+        for store in (self.cache, self.health):
+            if store is None:
+                continue
+            try:
+                store.flush()
+            except OSError as e:
+                logger.warning(f"Could not persist {store.path}: {e}")
+
+        return [item for name in sources if name in results for item in results[name]]
+
+    def _fetch_one(
+        self, name: str, url: str, parse: Callable[[str, requests.Response], list[Any]]
+    ) -> tuple[list[Any], float]:
+        """Returns the source's entries and how long fetching and parsing them took."""
+        started = time.monotonic()
+        # Held until the body is read, so the per-host limit also bounds downloads.
+        with self._host_limit(url):
+            items = self._fetch_and_parse(name, url, parse)
+        return items, time.monotonic() - started
+
+    def _fetch_and_parse(self, name: str, url: str, parse: Callable[[str, requests.Response], list[Any]]) -> list[Any]:
+        headers = self.cache.conditional_headers(url) if self.cache is not None else {}
+        with metrics.timer("feed_fetch", source=name):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+
+        if response.status_code == 304 and self.cache is not None:
+            response.close()
+            items = self.cache.revalidated(url)
+            if items is not None:
+                metrics.incr("feed_cache", result="not_modified")
+                return items
+            # The cache lost the entry since we sent the validators; refetch in full.
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+
+        # The body is streamed: parse may stop reading once it has enough entries.
+        try:
+            response.raise_for_status()
+            with metrics.timer("feed_parse", source=name):
+                items = parse(name, response)
+            metrics.incr("feed_bytes", response.raw.tell(), source=name)
+        finally:
+            response.close()
+        if self.cache is not None:
+            metrics.incr("feed_cache", result="miss")
+            self.cache.put(url, items, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return items
+
+    def _use_stale(self, results: dict[str, list[Any]], name: str, url: str):
+        if self.cache is None:
+            return
+        items = self.cache.stale(url)
+        if items is not None:
+            logger.info(f"Serving {len(items)} cached entries for {name}")
+            metrics.incr("feed_cache", result="stale")
+            results[name] = items
+
+    def _host_limit(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.per_host_limit)
+            return self._host_limits[host]
@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Any
+
+import metrics
+from storage import atomic_write_json, read_json
+
+FAILURE_THRESHOLD = 3  # consecutive failed (or too slow) fetches that open a breaker
+SLOW_THRESHOLD = 8.0  # seconds; a slower fetch counts as a failure for the breaker
+BASE_COOLDOWN = 5 * 60  # seconds an opened breaker skips its feed
+MAX_COOLDOWN = 60 * 60  # the cooldown doubles each time a trial fetch fails, up to this
+WINDOW = 20  # recent fetches behind the error rate and latency figures
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class FeedHealth:
+    """
+    Per-source health of the news feeds, with a circuit breaker per source.
+
+    Every fetch is recorded with its latency (or error). After
+    failure_threshold consecutive failures, counting fetches slower than
+    slow_threshold as failures, the source's breaker opens and allow() skips
+    it for a cooldown, so a dead or hanging feed stops costing time on every
+    run. After the cooldown one trial fetch is let through (half-open): a good
+    fetch closes the breaker, a bad one reopens it with a doubled cooldown.
+
+    State is persisted as one JSON file, written once per fetch round via
+    flush(), so breakers survive restarts.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        slow_threshold: float = SLOW_THRESHOLD,
+        base_cooldown: float = BASE_COOLDOWN,
+        max_cooldown: float = MAX_COOLDOWN,
+    ):
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._sources: dict[str, dict[str, Any]] = read_json(path, default={})
+        for entry in self._sources.values():
+            if entry["state"] == HALF_OPEN:  # the trial fetch died with the process
+                entry.update(state=OPEN, open_until=0.0)
+        self._dirty = False
+
+    def _entry(self, name: str) -> dict[str, Any]:
+        if name not in self._sources:
+            self._sources[name] = {
+                "state": CLOSED,
+                "consecutive_failures": 0,
+                "cooldown": self.base_cooldown,
+                "open_until": 0.0,
+                "fetches": 0,
+                "errors": 0,
+                "recent": [],  # [ok, seconds or None] of the last WINDOW fetches
+                "last_success": None,
+                "last_error": None,
+                "last_error_at": None,
+            }
+        return self._sources[name]
+
+    def allow(self, name: str) -> bool:
+        """Whether the source may be fetched now; moves an expired open breaker to half-open."""
+        with self._lock:
+            entry = self._entry(name)
+            if entry["state"] == CLOSED:
+                return True
+            if entry["state"] == OPEN and time.time() >= entry["open_until"]:
+                entry["state"] = HALF_OPEN
+                self._dirty = True
+                return True
+            # Open, or half-open with its trial fetch already in flight.
+            metrics.incr("feed_breaker_skips", source=name)
+            return False
+
+    def record_success(self, name: str, seconds: float):
+        slow = seconds > self.slow_threshold
+        with self._lock:
+            entry = self._entry(name)
+            entry["last_success"] = time.time()
+            self._record(entry, True, seconds)
+            if slow:
+                self._strike(name, entry)
+            else:
+                entry.update(state=CLOSED, consecutive_failures=0, cooldown=self.base_cooldown)
+
+    def record_failure(self, name: str, error: str, seconds: float | None = None):
+        with self._lock:
+            entry = self._entry(name)
+            entry["errors"] += 1
+            entry["last_error"] = error[:200]
+            entry["last_error_at"] = time.time()
+            self._record(entry, False, seconds)
+            self._strike(name, entry)
+
+    def _record(self, entry: dict[str, Any], ok: bool, seconds: float | None):
+        entry["fetches"] += 1
+        entry["recent"] = (entry["recent"] + [[ok, seconds]])[-WINDOW:]
+        self._dirty = True
+
+    def _strike(self, name: str, entry: dict[str, Any]):
+        entry["consecutive_failures"] += 1
+        if entry["state"] == HALF_OPEN:
+            entry["cooldown"] = min(entry["cooldown"] * 2, self.max_cooldown)
+        elif entry["consecutive_failures"] < self.failure_threshold:
+            return
+        entry["state"] = OPEN
+        entry["open_until"] = time.time() + entry["cooldown"]
+        metrics.incr("feed_breaker_opened", source=name)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Per-source state, error rate and median latency over the last WINDOW fetches."""
+        with self._lock:
+            report = {}
+            for name, entry in self._sources.items():
+                recent = entry["recent"]
+                latencies = sorted(seconds for _, seconds in recent if seconds is not None)
+                report[name] = {
+                    "state": entry["state"],
+                    "open_until": entry["open_until"] if entry["state"] == OPEN else None,
+                    "fetches": entry["fetches"],
+                    "error_rate": sum(1 for ok, _ in recent if not ok) / len(recent) if recent else 0.0,
+                    "p50_latency": latencies[len(latencies) // 2] if latencies else None,
+                    "last_success": entry["last_success"],
+                    "last_error": entry["last_error"],
+                    "last_error_at": entry["last_error_at"],
+                }
+            return report
+
+    def flush(self):
+        """Persists the health state if anything changed since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            atomic_write_json(self.path, self._sources)
+            self._dirty = False
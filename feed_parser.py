@@ -0,0 +1,126 @@
+import codecs
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Iterable, Iterator, NamedTuple
+
+import feedparser
+
+CHUNK_SIZE = 16 * 1024
+# Encodings expat decodes itself; anything else (EUC-KR, CP949, ...) is
+# transcoded here to UTF-8, with the XML declaration rewritten to match.
+_EXPAT_ENCODINGS = {"utf-8", "utf8", "utf-16", "utf16", "iso-8859-1", "latin-1", "latin1", "us-ascii", "ascii"}
+_DECLARED_ENCODING = re.compile(rb"""^\s*<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""")
+_DECLARATION_ENCODING = re.compile(r"""^(\s*<\?xml[^>]*encoding=["'])[A-Za-z0-9._-]+""")
+
+
+class Article(NamedTuple):
+    """One feed entry, as collected from RSS/Atom before ranking."""
+
+    source: str
+    title: str
+    url: str
+    summary: str
+    published_date: str
+    category: str
+
+    @classmethod
+    def from_cached(cls, item: Any) -> "Article":
+        """Rebuilds an article from its JSON form in the feed cache (a list, or a dict from older caches)."""
+        if isinstance(item, dict):
+            return cls(**{field: item.get(field, "") for field in cls._fields})
+        return cls(*item)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**self._asdict(), "importance_score": 0}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def charset_from_content_type(content_type: str | None) -> str | None:
+    """The charset parameter of a Content-Type header, if any (no text/* ISO-8859-1 default)."""
+    match = re.search(r"charset=[\"']?([A-Za-z0-9._-]+)", content_type or "")
+    return match.group(1) if match else None
+
+
+def _entry(source: str, element: ET.Element) -> Article:
+    fields: dict[str, str] = {}
+    for child in element:
+        name = _local(child.tag)
+        if name == "link" and child.get("href"):  # Atom
+            fields.setdefault("link", child.get("href", ""))
+        elif name not in fields:
+            fields[name] = (child.text or "").strip()
+    return Article(
+        source=source,
+        title=fields.get("title") or "No title",
+        url=fields.get("link") or fields.get("id") or "No link",
+        summary=fields.get("description") or fields.get("summary") or fields.get("content") or "No summary",
+        published_date=fields.get("pubDate") or fields.get("published") or fields.get("updated") or "No published date",
+        category=fields.get("category") or "General",
+    )
+
+
+def _chunks(chunks: Iterable[bytes], charset: str | None) -> Iterator[bytes]:
+    """Yields the document as is, or transcoded to UTF-8 when expat cannot decode its encoding."""
+    chunks = iter(chunks)
+    first = next(chunks, b"")
+    declared = _DECLARED_ENCODING.match(first)
+    encoding = (declared.group(1).decode("ascii") if declared else charset or "utf-8").lower()
+    if encoding in _EXPAT_ENCODINGS:
+        yield first
+        yield from chunks
+        return
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    yield _DECLARATION_ENCODING.sub(r"\1utf-8", decoder.decode(first), count=1).encode("utf-8")
+    for chunk in chunks:
+        yield decoder.decode(chunk).encode("utf-8")
+    yield decoder.decode(b"", final=True).encode("utf-8")
+
+
+def parse_feed(source: str, chunks: Iterable[bytes], limit: int, charset: str | None = None) -> list[Article]:
+    """
+    Incrementally parses an RSS 2.0 or Atom document and stops reading as soon
+    as limit entries are complete, so memory and parse time are bounded by the
+    entries kept rather than by the size of the feed. Parsed entries are cleared
+    from the tree. XML that expat rejects (malformed, or in an encoding it cannot
+    read) falls back to feedparser on the whole document.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    articles: list[Article] = []
+    chunks = iter(chunks)
+    consumed: list[bytes] = []
+
+    def recorded() -> Iterator[bytes]:
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    try:
+        for chunk in _chunks(recorded(), charset):
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if _local(element.tag) in ("item", "entry"):
+                    articles.append(_entry(source, element))
+                    element.clear()
+                    if len(articles) >= limit:
+                        return articles
+    except (ET.ParseError, LookupError, ValueError):
+        return _parse_with_feedparser(source, b"".join(consumed) + b"".join(chunks), limit)
+    return articles
+
+
+def _parse_with_feedparser(source: str, document: bytes | str, limit: int) -> list[Article]:
+    feed = feedparser.parse(document)
+    return [
+        Article(
+            source=source,
+            title=getattr(entry, "title", "No title"),
+            url=getattr(entry, "link", "No link"),
+            summary=getattr(entry, "summary", "No summary"),
+            published_date=getattr(entry, "published", "No published date"),
+            category=getattr(entry, "category", "General"),
+        )
+        for entry in feed.entries[:limit]
+    ]
@@ -0,0 +1,89 @@
+import logging
+import os
+import threading
+import tomllib
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHT = 1.0
+DEFAULT_ITEMS = 10
+DEFAULT_INTERVAL_MINUTES = 0
+FEEDS_CONFIG = os.getenv("FEEDS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "feeds.toml"))
+
+
+class FeedSource(NamedTuple):
+    name: str
+    url: str
+    region: str
+    weight: float = DEFAULT_WEIGHT
+    items: int = DEFAULT_ITEMS
+    interval: float = 0  # seconds the last fetch is reused before requesting again
+
+
+def load_feeds(path: str) -> list[FeedSource]:
+    """Reads and validates the [[feeds]] entries of a TOML feed config."""
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    defaults = config.get("defaults", {})
+    sources = []
+    names = set()
+    for i, entry in enumerate(config.get("feeds", [])):
+        entry = {**defaults, **entry}
+        missing = [key for key in ("name", "url", "region") if not entry.get(key)]
+        if missing:
+            raise ValueError(f"{path}: feed #{i + 1} is missing {', '.join(missing)}")
+        if entry["name"] in names:
+            raise ValueError(f"{path}: duplicate feed name {entry['name']!r}")
+        names.add(entry["name"])
+        source = FeedSource(
+            name=entry["name"],
+            url=entry["url"],
+            region=entry["region"],
+            weight=float(entry.get("weight", DEFAULT_WEIGHT)),
+            items=int(entry.get("items", DEFAULT_ITEMS)),
+            interval=float(entry.get("interval_minutes", DEFAULT_INTERVAL_MINUTES)) * 60,
+        )
+        if source.weight < 0 or source.items < 1 or source.interval < 0:
+            raise ValueError(f"{path}: feed {source.name!r} needs weight >= 0, items >= 1 and interval_minutes >= 0")
+        sources.append(source)
+    return sources
+
+
+class FeedRegistry:
+    """
+    The configured news feeds, loaded from a TOML file.
+
+    The file is re-read when its modification time changes, so feeds can be
+    added, removed or re-weighted without a restart. If a changed file does
+    not load, the previous feeds stay in use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime
+        self._sources = load_feeds(path)
+
+    def sources(self, region: str | None = None) -> list[FeedSource]:
+        """Returns the configured feeds, optionally only those of one region, in file order."""
+        self._reload_if_changed()
+        with self._lock:
+            return [source for source in self._sources if region is None or source.region == region]
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            logger.warning(f"Cannot stat feed config {self.path}, keeping current feeds: {e}")
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                self._sources = load_feeds(self.path)
+            except (OSError, ValueError) as e:  # TOMLDecodeError is a ValueError
+                logger.error(f"Invalid feed config {self.path}, keeping current feeds: {e}")
+                return
+        logger.info(f"Reloaded {len(self._sources)} feeds from {self.path}")
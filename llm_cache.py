@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable
+
+from crewai.llms.base_llm import BaseLLM
+
+import metrics
+
+LLM_CACHE_TTL = 6 * 3600  # seconds
+LLM_CACHE_MAX_ENTRIES = 1000
+SKETCH_SIZE = 128  # hashes kept per prompt for similarity lookups
+SHINGLE_WORDS = 5
+
+
+def _prompt_text(messages: str | list[dict[str, str]]) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(f"{message.get('role', '')}: {message.get('content', '')}" for message in messages)
+
+
+def sketch(text: str, size: int = SKETCH_SIZE) -> list[int]:
+    """Bottom-k MinHash sketch of the prompt's word shingles."""
+    words = text.split()
+    shingles = {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+        for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))
+    }
+    return sorted(shingles)[:size]
+
+
+def sketch_similarity(a: list[int], b: list[int], size: int = SKETCH_SIZE) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two sketches."""
+    set_a, set_b = set(a), set(b)
+    union = sorted(set_a | set_b)[:size]
+    if not union:
+        return 1.0
+    return sum(1 for h in union if h in set_a and h in set_b) / len(union)
+
+
+class LLMCache:
+    """
+    On-disk cache of LLM responses in SQLite, keyed by a hash of the model and
+    the exact prompt.
+
+    Entries expire after ttl seconds. Beyond max_entries, the least recently
+    used entries are evicted. With a similarity threshold, a prompt with no
+    exact entry can be served by the most similar cached prompt of the same
+    model, if their estimated shingle overlap reaches the threshold. Sketches
+    are kept in memory for these lookups.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        similarity_threshold: float | None = None,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                sketch TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._sketches: dict[str, tuple[str, list[int]]] = {}
+        if similarity_threshold is not None:
+            rows = self._conn.execute(
+                "SELECT key, model, sketch FROM responses WHERE created_at >= ?", (time.time() - ttl,)
+            ).fetchall()
+            self._sketches = {key: (model, json.loads(value)) for key, model, value in rows}
+
+    @staticmethod
+    def key(model: str, messages: str | list[dict[str, str]], stop: list[str] | None = None) -> str:
+        payload = json.dumps({"model": model, "messages": messages, "stop": sorted(stop or [])}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, messages: str | list[dict[str, str]], stop: list[str] | None = None) -> str | None:
+        """Returns the cached response for an exact (or, if enabled, similar enough) prompt."""
+        exact_key = key = self.key(model, messages, stop)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None and self.similarity_threshold is not None:
+                key, row = self._similar(model, _prompt_text(messages), now)
+            if row is None:
+                self.misses += 1
+                metrics.incr("llm_cache", result="miss")
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        if key == exact_key:
+            self.hits += 1
+            metrics.incr("llm_cache", result="hit")
+        else:
+            self.similar_hits += 1
+            metrics.incr("llm_cache", result="similar_hit")
+        return row[0]
+
+    def _similar(self, model: str, text: str, now: float) -> tuple[str, tuple | None]:
+        target = sketch(text)
+        best_key, best_score = None, 0.0
+        for key, (entry_model, entry_sketch) in self._sketches.items():
+            if entry_model != model:
+                continue
+            score = sketch_similarity(target, entry_sketch)
+            if score > best_score:
+                best_key, best_score = key, score
+        if best_key is None or best_score < self.similarity_threshold:
+            return "", None
+        row = self._conn.execute(
+            "SELECT response FROM responses WHERE key = ? AND created_at >= ?", (best_key, now - self.ttl)
+        ).fetchone()
+        return best_key, row
+
+    def put(self, model: str, messages: str | list[dict[str, str]], response: str, stop: list[str] | None = None):
+        """Stores a response, then drops expired and least recently used entries."""
+        key = self.key(model, messages, stop)
+        entry_sketch = sketch(_prompt_text(messages)) if self.similarity_threshold is not None else []
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, sketch, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, json.dumps(entry_sketch), now, now),
+            )
+            if self.similarity_threshold is not None:
+                self._sketches[key] = (model, entry_sketch)
+            evicted = [row[0] for row in self._conn.execute(
+                """
+                SELECT key FROM responses WHERE created_at < ?
+                UNION
+                SELECT key FROM (SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)
+                """,
+                (now - self.ttl, self.max_entries),
+            )]
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in evicted])
+            for key in evicted:
+                self._sketches.pop(key, None)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.similar_hits + self.misses
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLLM(BaseLLM):
+    """
+    crewai LLM wrapper that answers repeated prompts from an LLMCache.
+
+    Wraps any crewai LLM (or test double with a call(messages) method).
+    Calls that use native tool calling are never cached, and neither are
+    non-text results. With bypass set, every call goes to the wrapped model
+    and its response is not stored.
+
+    Callers that check the reply pass validate: a response is then stored
+    only if it passes, and a cached response that fails is not served. So a
+    caller retrying after an invalid reply reaches the model again instead of
+    getting the same reply back from the cache.
+    """
+
+    def __init__(self, llm: Any, cache: LLMCache, bypass: bool = False):
+        super().__init__(model=getattr(llm, "model", "unknown"), temperature=getattr(llm, "temperature", None))
+        self.llm = llm
+        self.cache = cache
+        self.bypass = bypass
+
+    # crewai sets the agent's stop words on its llm; they belong to the wrapped model.
+    @property
+    def stop(self) -> list[str]:
+        return getattr(self.llm, "stop", None) or []
+
+    @stop.setter
+    def stop(self, value: list[str]):
+        if hasattr(self, "llm"):
+            self.llm.stop = value
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+        from_task: Any | None = None,
+        from_agent: Any | None = None,
+        validate: Callable[[str], bool] | None = None,
+    ) -> str | Any:
+        cacheable = not self.bypass and not tools and not available_functions
+        if not cacheable:
+            metrics.incr("llm_cache", result="bypass")
+        else:
+            cached = self.cache.get(self.model, messages, self.stop)
+            if cached is not None:
+                if validate is None or validate(cached):
+                    return cached
+                metrics.incr("llm_cache", result="rejected")
+
+        kwargs = {"callbacks": callbacks, "from_task": from_task, "from_agent": from_agent}
+        if tools:
+            kwargs.update(tools=tools, available_functions=available_functions)
+        response = self.llm.call(messages, **{key: value for key, value in kwargs.items() if value is not None})
+        if cacheable and isinstance(response, str) and response.strip() and (validate is None or validate(response)):
+            self.cache.put(self.model, messages, response, self.stop)
+        return response
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words() if hasattr(self.llm, "supports_stop_words") else super().supports_stop_words()
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling() if hasattr(self.llm, "supports_function_calling") else False
+
+    def get_context_window_size(self) -> int:
+        if hasattr(self.llm, "get_context_window_size"):
+            return self.llm.get_context_window_size()
+        return super().get_context_window_size()
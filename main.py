@@ -1,4 +1,59 @@
-from bot import run_bot
-
-if __name__ == "__main__":
-    run_bot()
\ No newline at end of file
+"""
+Starts the news briefing bot.
+
+Usage:
+    python main.py                  # run the bot
+    python main.py --startup-time   # measure startup without connecting to Telegram
+"""
+import argparse
+import json
+from time import perf_counter
+
+STARTED = perf_counter()
+
+
+def measure_startup(as_json: bool = False):
+    """
+    Reports how long the bot takes until it can poll (importing bot and building
+    the application) and how long the crew stack then takes to load in the
+    background. Nothing is sent to Telegram.
+    """
+    timings = {}
+    started = perf_counter()
+    import bot
+    timings["import_bot"] = perf_counter() - started
+
+    started = perf_counter()
+    bot.build_application(bot.TELEGRAM_TOKEN or "0:startup-measurement")
+    timings["build_application"] = perf_counter() - started
+    timings["ready_to_poll"] = perf_counter() - STARTED
+
+    started = perf_counter()
+    bot.load_crew_stack()
+    timings["load_crew_stack"] = perf_counter() - started
+
+    report = {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()}
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'stage':<20} {'ms':>10}")
+    for stage, ms in report.items():
+        print(f"{stage:<20} {ms:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="News briefing Telegram bot.")
+    parser.add_argument("--startup-time", action="store_true", help="measure startup and exit")
+    parser.add_argument("--json", action="store_true", help="with --startup-time, print the report as JSON")
+    args = parser.parse_args()
+    if args.startup_time:
+        measure_startup(args.json)
+        return
+
+    from bot import logger, run_bot
+    logger.info(f"Bot initialized in {perf_counter() - STARTED:.2f}s, starting to poll")
+    run_bot()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = "newsbot"
+
+Labels = tuple[tuple[str, str], ...]
+Result = TypeVar("Result")
+
+
+class RunMetrics:
+    """
+    Timings and counters collected during one briefing run.
+
+    Timings accumulate seconds and a call count per (name, labels), e.g.
+    ("task", {"task": "curate_final_news_task"}); counters accumulate values
+    such as fetched bytes, cache hits or LLM tokens.
+    """
+
+    def __init__(self):
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        self.timings: dict[tuple[str, Labels], list[float]] = {}
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = (name, _labels(labels))
+        with self._lock:
+            total, count = self.timings.get(key, (0.0, 0))
+            self.timings[key] = [total + seconds, count + 1]
+
+    def incr(self, name: str, value: float = 1, **labels: str):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def total(self, name: str) -> float:
+        """Sum of a counter over all its labels."""
+        with self._lock:
+            return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    @property
+    def wall_time(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "wall_time": round(self.wall_time, 3),
+                "timings": [
+                    {"name": name, "labels": dict(labels), "seconds": round(total, 3), "count": count}
+                    for (name, labels), (total, count) in sorted(self.timings.items())
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """Renders the run in the Prometheus text exposition format."""
+        lines = [
+            f"# TYPE {PROMETHEUS_PREFIX}_run_wall_seconds gauge",
+            f"{PROMETHEUS_PREFIX}_run_wall_seconds {self.wall_time:.3f}",
+        ]
+        data = self.to_dict()
+        seen: set[str] = set()
+        for timing in data["timings"]:
+            metric = f"{PROMETHEUS_PREFIX}_{timing['name']}_seconds"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{_prometheus_labels(timing['labels'])} {timing['seconds']}")
+        for counter in data["counters"]:
+            metric = f"{PROMETHEUS_PREFIX}_{counter['name']}"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{_prometheus_labels(counter['labels'])} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Human-readable breakdown of the run, used by the bot's /stats command."""
+        return run_summary(self.to_dict())
+
+
+def run_summary(data: dict[str, Any]) -> str:
+    """Human-readable breakdown of a run exported by to_dict()."""
+    lines = [f"Run {data['run_id']} - {data['wall_time']:.1f}s total"]
+    for timing in data["timings"]:
+        label = ", ".join(timing["labels"].values())
+        lines.append(f"  {timing['name']}[{label}]: {timing['seconds']:.2f}s x{timing['count']}")
+    for counter in data["counters"]:
+        label = ", ".join(counter["labels"].values())
+        lines.append(f"  {counter['name']}[{label}]: {counter['value']:g}")
+    return "\n".join(lines)
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _prometheus_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# --- Current run ---
+# Instrumentation points call the module-level helpers below, which record into
+# the run started by start_run() in the caller's context. They are no-ops when
+# no run is active. Each run lives in its own context, so runs on different
+# briefing workers overlap without mixing; work handed to other threads must
+# carry the context along (see propagate).
+_current: ContextVar[RunMetrics | None] = ContextVar("metrics_run", default=None)
+_export_lock = threading.Lock()
+last_run: RunMetrics | None = None
+
+
+def start_run() -> RunMetrics:
+    """Starts a run in the current context (a thread, or a context copied by propagate)."""
+    run = RunMetrics()
+    _current.set(run)
+    return run
+
+
+def finish_run(directory: str) -> RunMetrics | None:
+    """
+    Ends the current context's run and exports it: one JSON line appended to
+    metrics.jsonl and the latest run as a Prometheus text file (metrics.prom).
+    """
+    global last_run
+    run = _current.get()
+    _current.set(None)
+    if run is None:
+        return None
+    run.finished_at = time.time()
+    with _export_lock:
+        last_run = run
+        _export(run, directory)
+    return run
+
+
+def propagate(fn: Callable[..., Result]) -> Callable[..., Result]:
+    """
+    Binds fn to a copy of the caller's context, so what it records from a pool
+    or thread goes to the caller's run. Wrap each submission separately: a
+    context can only be entered by one thread at a time.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def _export(run: RunMetrics, directory: str):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "metrics.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(run.to_dict(), ensure_ascii=False) + "\n")
+        prom_path = os.path.join(directory, "metrics.prom")
+        tmp_path = f"{prom_path}.{os.getpid()}.tmp"  # worker processes may export at the same time
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(run.to_prometheus())
+        os.replace(tmp_path, prom_path)
+    except OSError as e:
+        logger.warning(f"Could not export run metrics: {e}")
+
+
+def read_last_run(directory: str) -> dict[str, Any] | None:
+    """
+    The latest run exported to directory's metrics.jsonl, by any process (such
+    as the briefing workers), or None if there is none. Reads only the file's tail.
+    """
+    path = os.path.join(directory, "metrics.jsonl")
+    try:
+        with open(path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            tail = b""
+            while end > 0 and tail.rstrip(b"\n").count(b"\n") == 0:
+                start = max(end - 8192, 0)
+                f.seek(start)
+                tail = f.read(end - start) + tail
+                end = start
+    except OSError:
+        return None
+    lines = tail.rstrip(b"\n").rsplit(b"\n", 1)
+    if not lines[-1]:
+        return None
+    try:
+        return json.loads(lines[-1])
+    except ValueError:
+        logger.warning(f"Unreadable last line in {path}")
+        return None
+
+
+def observe(name: str, seconds: float, **labels: str):
+    run = _current.get()
+    if run is not None:
+        run.observe(name, seconds, **labels)
+
+
+def incr(name: str, value: float = 1, **labels: str):
+    run = _current.get()
+    if run is not None:
+        run.incr(name, value, **labels)
+
+
+@contextmanager
+def timer(name: str, **labels: str) -> Iterator[None]:
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - started, **labels)
+
+
+def record_token_usage(crew: Any):
+    """Records prompt/completion tokens per agent after a crew run."""
+    for agent in crew.agents:
+        token_process = getattr(agent, "_token_process", None)
+        if token_process is None:
+            continue
+        record_usage(token_process, agent.role)
+
+
+def record_usage(token_process: Any, agent: str):
+    """Records the tokens counted by a crewai TokenProcess against agent."""
+    usage = token_process.get_summary()
+    incr("llm_prompt_tokens", usage.prompt_tokens, agent=agent)
+    incr("llm_completion_tokens", usage.completion_tokens, agent=agent)
+    incr("llm_requests", usage.successful_requests, agent=agent)
+
+
+_listeners_installed = False
+
+
+def install_crewai_listeners():
+    """Times crewai tasks and tool calls through the crewai event bus (once per process)."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    _listeners_installed = True
+
+    from crewai.events import (TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent,
+                               ToolUsageErrorEvent, ToolUsageFinishedEvent, crewai_event_bus)
+
+    # Keyed by task id: tasks of concurrent runs share their names.
+    task_started: dict[str, float] = {}
+
+    def task_name(event: Any) -> str:
+        task = getattr(event, "task", None)
+        return getattr(task, "name", None) or "unnamed"
+
+    def task_id(event: Any) -> str:
+        task = getattr(event, "task", None)
+        return str(getattr(task, "id", None) or id(task))
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source: Any, event: TaskStartedEvent):
+        task_started[task_id(event)] = time.monotonic()
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source: Any, event: TaskCompletedEvent):
+        started = task_started.pop(task_id(event), None)
+        if started is not None:
+            observe("task", time.monotonic() - started, task=task_name(event))
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source: Any, event: TaskFailedEvent):
+        task_started.pop(task_id(event), None)
+        incr("task_failures", task=task_name(event))
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source: Any, event: ToolUsageFinishedEvent):
+        seconds = (event.finished_at - event.started_at).total_seconds()
+        observe("tool_call", seconds, tool=event.tool_name)
+        if event.from_cache:
+            incr("tool_cache_hits", tool=event.tool_name)
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source: Any, event: ToolUsageErrorEvent):
+        incr("tool_errors", tool=event.tool_name)
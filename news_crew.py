@@ -1,19 +1,149 @@
+import functools
+import logging
 import os
+import threading
+from concurrent.futures import Future
 from dotenv import load_dotenv
-from crewai import Crew, Agent, Task
-from langchain_openai import ChatOpenAI
+from typing import Callable, get_args
+from crewai import Crew, Agent, Task, LLM
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.converter import Converter
 from datetime import datetime
-from tool import web_search_tool, global_news_research_tool, korean_news_research_tool
+from llm_cache import CachedLLM, LLMCache
+import metrics
+from storage import atomic_write_json, atomic_write_text
+from summarizer import BatchSummarizer, SummaryBatch, estimate_tokens
+from task_outputs import ResearchArticles, extract_items, output_articles, validate_items
+from tool import DATA_DIR, SummarizeArticlesTool, article_store, global_news_research_tool, korean_news_research_tool
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 FETCH_NEWS_COUNT = 10
 
+# Responses to repeated prompts are served from disk. LLM_CACHE_SIMILARITY (0-1)
+# also serves near-identical prompts; LLM_CACHE_BYPASS=1 always calls the model.
+llm_cache = LLMCache(
+    os.path.join(DATA_DIR, "llm_cache.db"),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "21600")),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+    similarity_threshold=float(os.environ["LLM_CACHE_SIMILARITY"]) if os.getenv("LLM_CACHE_SIMILARITY") else None,
+)
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+# Each task with the tasks whose outputs it needs, in dependency order. Tasks
+# that only depend on earlier levels run in parallel, so another regional
+# research task added here does not make a briefing run longer.
+TASK_GRAPH = {
+    "research_global_news_task": [],
+    "research_korean_news_task": [],
+    "edit_and_summarize_articles_task": ["research_global_news_task", "research_korean_news_task"],
+    "curate_final_news_task": ["edit_and_summarize_articles_task"],
+}
+# Tasks that read their dependencies' outputs through a tool, so those outputs
+# are kept out of their prompt.
+TOOL_FED_TASKS = {"edit_and_summarize_articles_task"}
+# Where each task's output is saved, written atomically once the task completes.
+OUTPUT_FILES = {
+    "research_global_news_task": "output/global_news.json",
+    "research_korean_news_task": "output/korean_news.json",
+    "edit_and_summarize_articles_task": "output/news_summary.json",
+    "curate_final_news_task": "output/final_news_briefing.md",
+}
+
+
+class NewsTask(Task):
+    """
+    crewai Task whose asynchronous execution runs in a copy of the kicking-off
+    thread's context, so what the task records goes to that run's metrics
+    (crewai starts a bare thread, which would start with an empty context).
+    A task that fails completes its future with the error, so kickoff raises it;
+    crewai's own thread leaves the future pending and kickoff waits forever.
+    """
+
+    def execute_async(self, agent=None, context=None, tools=None) -> Future[TaskOutput]:
+        future: Future[TaskOutput] = Future()
+        threading.Thread(
+            daemon=True,
+            target=metrics.propagate(self._execute_task_async),
+            args=(agent, context, tools, future),
+        ).start()
+        return future
+
+    def _execute_task_async(self, agent, context, tools, future: Future[TaskOutput]):
+        try:
+            result = self._execute_core(agent, context, tools)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+
+class LocalRepairConverter(Converter):
+    """
+    crewai hands a task's answer to its converter when the answer does not
+    validate against the task's output_pydantic model, and the default
+    converter asks the LLM to convert it again. This one repairs the answer
+    locally instead: the article list is extracted from the text, each article
+    is validated on its own and invalid ones are dropped (see
+    task_outputs.validate_items). Output models have one field, articles.
+    """
+
+    def to_pydantic(self, current_attempt: int = 1):
+        item_model = get_args(self.model.model_fields["articles"].annotation)[0]
+        metrics.incr("task_output_repairs", model=self.model.__name__)
+        return self.model(articles=validate_items(extract_items(self.text), item_model, self.model.__name__))
+
+    def to_json(self, current_attempt: int = 1):
+        return self.to_pydantic().model_dump_json()
+
+
+def save_output(output: TaskOutput):
+    """Task callback writing a task's output (its validated model, if it has one) to OUTPUT_FILES."""
+    path = OUTPUT_FILES.get(output.name or "")
+    if path is None:
+        return
+    try:
+        if output.pydantic is not None:
+            atomic_write_json(path, output.pydantic.model_dump())
+        else:
+            atomic_write_text(path, output.raw)
+    except OSError:
+        logger.exception(f"Could not save the output of {output.name} to {path}")
+
+
+def _cached(factory):
+    """Builds an agent or task once per NewsCrew (and per arguments) instead of on every call."""
+    @functools.wraps(factory)
+    def wrapper(self, *args):
+        key = (factory.__name__, *args)
+        if key not in self._instances:
+            self._instances[key] = factory(self, *args)
+        return self._instances[key]
+    return wrapper
+
 class NewsCrew:
     def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o")
-
-    def research_specialist_agent(self) -> Agent:
+        self.llm = CachedLLM(LLM(model="gpt-4o"), llm_cache, bypass=LLM_CACHE_BYPASS)
+        self.summarizer = BatchSummarizer(self.llm, store=article_store, agent="Senior Editor")
+        self._tasks: dict[str, Task] = {}
+        self._instances: dict[tuple, Agent | Task] = {}
+
+    def _research_articles(self) -> list[dict]:
+        """Articles collected by the research tasks the editor stage depends on, as validated by their output model."""
+        articles = []
+        for name in TASK_GRAPH["edit_and_summarize_articles_task"]:
+            output = self._tasks[name].output if name in self._tasks else None
+            if output is not None:
+                articles += output_articles(output)
+                metrics.incr("prompt_tokens_saved", estimate_tokens(output.raw), source="editor_context")
+        unique = {article["url"]: article for article in reversed(articles) if article.get("url")}
+        return list(reversed(unique.values()))
+
+    @_cached
+    def research_specialist_agent(self, region: str) -> Agent:
+        """One research agent per region: crewai agents must not run two tasks at once."""
         return Agent(
             role="Research Specialist",
             goal="Collect as many latest news articles from RSS feeds as possible",
@@ -26,12 +156,14 @@ class NewsCrew:
             """,
             llm=self.llm,
             verbose=True,
-            tools=[global_news_research_tool, korean_news_research_tool],
+            tools=[{"global": global_news_research_tool, "korean": korean_news_research_tool}[region]],
         )
 
+    @_cached
     def research_global_news_task(self) -> Task:
-        return Task(
-            agent=self.research_specialist_agent(),
+        return NewsTask(
+            name="research_global_news_task",
+            agent=self.research_specialist_agent("global"),
             description=f"""
             Today is {datetime.now().strftime("%Y-%m-%d")}
             Collect the latest news articles from global news RSS sources.
@@ -41,17 +173,17 @@ class NewsCrew:
             1. **First, call global_news_research_tool** to fetch actual RSS data.
             2. **Wait for the tool result and use only the actual data received**.
             3. **Never generate arbitrary news or example data.**
-            4. Sort the data received from the RSS tool by importance and relevance (prioritize latest).
-            5. Remove duplicate articles.
-            6. Select the top {FETCH_NEWS_COUNT} hottest news articles.
+            4. The tool result is already deduplicated and ranked by recency and coverage (best first).
+               Adjust the order only where importance and relevance clearly differ.
+            5. Select the top {FETCH_NEWS_COUNT} hottest news articles.
 
             **Warning: This task is for actual news collection, so you must call global_news_research_tool.
             Creating fake news from previous dates is strictly prohibited.
             The RSS tool provides current real news.**
             """,
             expected_output=f"""
-            JSON list in the following format:
-            [
+            JSON object in the following format:
+            {{"articles": [
                 {{
                     "title": "Article title",
                     "url": "Article URL",
@@ -61,16 +193,20 @@ class NewsCrew:
                     "category": "Category",
                     "importance_score": "Importance score 1-10"
                 }}
-            ]
+            ]}}
             Maximum {FETCH_NEWS_COUNT} global news articles
             """,
-            output_file="output/global_news.json",
+            output_pydantic=ResearchArticles,
+            converter_cls=LocalRepairConverter,
+            callback=save_output,
             tools=[global_news_research_tool]
         )
 
+    @_cached
     def research_korean_news_task(self) -> Task:
-        return Task(
-            agent=self.research_specialist_agent(),
+        return NewsTask(
+            name="research_korean_news_task",
+            agent=self.research_specialist_agent("korean"),
             description=f"""
             Today is {datetime.now().strftime("%Y-%m-%d")}
             Collect the latest news articles from major Korean media RSS feeds.
@@ -80,17 +216,17 @@ class NewsCrew:
             1. **First, call korean_news_research_tool** to fetch actual RSS data.
             2. **Wait for the tool result and use only the actual data received**.
             3. **Never generate arbitrary news or example data.**
-            4. Analyze the data received from the RSS tool by importance and timeliness.
-            5. Remove duplicate and similar articles.
-            6. Select the top {FETCH_NEWS_COUNT} hottest Korean news.
+            4. The tool result is already deduplicated and ranked by timeliness and coverage (best first).
+               Adjust the order only where importance clearly differs.
+            5. Select the top {FETCH_NEWS_COUNT} hottest Korean news.
 
             **Warning: This task is for actual news collection, so you must call korean_news_research_tool.
             Creating fake news from previous dates is strictly prohibited.
             The RSS tool provides current real news.**
             """,
             expected_output=f"""
-            JSON list in the following format:
-            [
+            JSON object in the following format:
+            {{"articles": [
                 {{
                     "title": "Article title",
                     "url": "Article URL",
@@ -100,13 +236,16 @@ class NewsCrew:
                     "category": "Category (Politics/Economy/Society/International etc.)",
                     "importance_score": "Importance score 1-10"
                 }}
-            ]
+            ]}}
             Maximum {FETCH_NEWS_COUNT} Korean news articles
             """,
-            output_file="output/korean_news.json",
+            output_pydantic=ResearchArticles,
+            converter_cls=LocalRepairConverter,
+            callback=save_output,
             tools=[korean_news_research_tool]
         )
 
+    @_cached
     def editor_agent(self) -> Agent:
         return Agent(
             role="Senior Editor",
@@ -121,45 +260,36 @@ class NewsCrew:
             """,
             llm=self.llm,
             verbose=True,
-            tools=[web_search_tool],
+            tools=[
+                SummarizeArticlesTool(
+                    load_articles=self._research_articles, summarizer=self.summarizer, result_as_answer=True
+                )
+            ],
         )
 
+    @_cached
     def edit_and_summarize_articles_task(self) -> Task:
-        return Task(
+        return NewsTask(
+            name="edit_and_summarize_articles_task",
             agent=self.editor_agent(),
             description="""
             Extract the actual article content and summarize the global and Korean news articles collected by the research agent.
 
             **Required Steps:**
 
-            1. **Use Previous Task Results**:
-               - Use all news article data collected from research_global_news_task and research_korean_news_task.
-               - Access the URL in the link field of each article to extract the actual article content.
-
-            2. **Extract Article Content**:
-               - Access each news link to extract the actual article content.
-               - Exclude unnecessary content such as advertisements, related articles, and comments, and extract only the core article content.
-               - Clearly separate title, date, content, and source.
-
-            3. **Summarize and Translate Content**:
-               - Naturally translate English articles into Korean.
-               - Summarize the key content of each article in 2-3 sentences.
-               - Organize clearly and concisely without distorting the original meaning.
-
-            4. **Process All Articles**:
-               - Perform work on all collected articles (process all, not just selected ones).
-               - Process each article with the same quality.
-               - Skip inaccessible links and process only accessible articles.
+            1. **Call summarize_articles_tool ONCE** (it takes no arguments).
+               - It reads every article collected by research_global_news_task and research_korean_news_task,
+                 scrapes the actual article content, and translates and summarizes all articles into Korean
+                 in parallel batches, validating each batch.
+            2. **Its result is your final answer.** Do not rewrite, shorten or re-summarize it.
 
             **Important Guidelines:**
-            - You must access the actual website to get the article content.
-            - Don't rely on existing RSS summaries, read and summarize the entire article.
-            - Translate all foreign language articles into Korean.
-            - Process all articles in a consistent format.
+            - Never summarize articles yourself or from memory.
+            - Inaccessible articles are summarized from their RSS summary or skipped by the tool.
             """,
             expected_output="""
-            JSON list in the following format:
-            [
+            JSON object in the following format:
+            {"articles": [
                 {
                     "original_title": "Original article title",
                     "title": "Translated article title (in Korean)",
@@ -170,14 +300,18 @@ class NewsCrew:
                     "full_content_summary": "Detailed summary based on actual article content (in Korean, 2-3 sentences)",
                     "key_points": ["Key point 1", "Key point 2", "Key point 3"],
                     "article_url": "Original article URL",
-                    "importance_score": "Importance score 1-10"
+                    "importance_score": "Importance score 1-10",
+                    "region": "global or korean"
                 }
-            ]
+            ]}
             Detailed analysis results of all global and Korean news articles
             """,
-            output_file="output/news_summary.json"
+            output_pydantic=SummaryBatch,
+            converter_cls=LocalRepairConverter,
+            callback=save_output,
         )
 
+    @_cached
     def curator_agent(self) -> Agent:
         return Agent(
             role="News Curator",
@@ -194,8 +328,10 @@ class NewsCrew:
             tools=[]
         )
 
+    @_cached
     def curate_final_news_task(self) -> Task:
-        return Task(
+        return NewsTask(
+            name="curate_final_news_task",
             agent=self.curator_agent(),
             description=f"""
             Today is {datetime.now().strftime("%Y-%m-%d")}
@@ -280,17 +416,42 @@ class NewsCrew:
 
             ============================================
             """,
-            output_file="output/final_news_briefing.md",
-            context=[self.edit_and_summarize_articles_task()]
+            callback=save_output,
         )
 
-    def crew(self) -> Crew:
+    def crew(self, task_callback: Callable[[TaskOutput], None] | None = None) -> Crew:
+        """
+        Builds the crew from TASK_GRAPH. Each agent and task is created once and
+        receives exactly the outputs of the tasks it depends on (in its prompt,
+        unless it is one of TOOL_FED_TASKS). Tasks of the same level
+        run concurrently (async_execution) and are joined by the first task of
+        the next level. task_callback receives each task's output as soon as
+        the task completes.
+        """
+        tasks = self._tasks = {}
+        levels: dict[str, int] = {}
+        for name, dependencies in TASK_GRAPH.items():
+            task = getattr(self, name)()
+            task.context = [] if name in TOOL_FED_TASKS else [tasks[dependency] for dependency in dependencies]
+            levels[name] = 1 + max((levels[dependency] for dependency in dependencies), default=-1)
+            tasks[name] = task
+
+        ordered = sorted(tasks, key=levels.get)
+        previous_level_async = False
+        for level in sorted(set(levels.values())):
+            names = [name for name in ordered if levels[name] == level]
+            for i, name in enumerate(names):
+                joins_previous = i == 0 and previous_level_async
+                tasks[name].async_execution = len(names) > 1 and not joins_previous and name != ordered[-1]
+            previous_level_async = any(tasks[name].async_execution for name in names)
+
+        task_list = [tasks[name] for name in ordered]
         return Crew(
-            agents=[self.research_specialist_agent(), self.editor_agent(), self.curator_agent()],
-            tasks=[self.research_global_news_task(), self.research_korean_news_task(), self.edit_and_summarize_articles_task(), self.curate_final_news_task()],
+            agents=list({id(task.agent): task.agent for task in task_list}.values()),
+            tasks=task_list,
+            task_callback=task_callback,
             verbose=True
         )
 
 if __name__ == "__main__":
-    os.makedirs("output", exist_ok=True)
     NewsCrew().crew().kickoff()
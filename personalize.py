@@ -0,0 +1,106 @@
+import re
+from collections import Counter
+from datetime import datetime
+
+from preference_store import Preferences
+from ranking import parse_published
+
+RULE = "=" * 44
+SEPARATOR = "─" * 40
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def _importance(article: dict) -> int:
+    try:
+        return int(article.get("importance_score", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def region_of(article: dict) -> str:
+    """The article's region as tagged by the summarize tool, guessed from its original title otherwise."""
+    if article.get("region") in ("global", "korean"):
+        return article["region"]
+    return "korean" if _HANGUL.search(article.get("original_title", "")) else "global"
+
+
+def _matches(article: dict, categories: tuple[str, ...]) -> bool:
+    if not categories:
+        return True
+    category = article.get("category", "").lower()
+    return any(wanted.lower() in category for wanted in categories)
+
+
+def select_articles(pool: list[dict], preferences: Preferences) -> list[dict]:
+    """
+    Picks a chat's articles from the shared pool of edited articles: those in
+    its categories, by importance score, with round(article_count *
+    global_share) global articles and the rest Korean. If one region runs
+    short, the other fills the gap. Returns them most important first.
+    """
+    ranked = sorted((a for a in pool if _matches(a, preferences.categories)), key=_importance, reverse=True)
+    count = preferences.article_count
+    global_count = round(count * preferences.global_share)
+    chosen = (
+        [a for a in ranked if region_of(a) == "global"][:global_count]
+        + [a for a in ranked if region_of(a) == "korean"][:count - global_count]
+    )
+    chosen_ids = {id(a) for a in chosen}
+    chosen += [a for a in ranked if id(a) not in chosen_ids][:count - len(chosen)]
+    return sorted(chosen, key=_importance, reverse=True)
+
+
+def _published(value: str) -> str:
+    published = parse_published(value)
+    return published.strftime("%Y-%m-%d") if published else value or "Unknown"
+
+
+def render_briefing(articles: list[dict], preferences: Preferences, date: datetime) -> str:
+    """
+    Renders selected articles in the curator's report layout (so the chunker
+    splits it between articles), without the LLM-written trend analysis.
+    """
+    topics = ", ".join(preferences.categories) or "All"
+    if not articles:
+        return (
+            f"No articles in the current news match your topics ({topics}).\n"
+            "Use /topics all to receive every category again."
+        )
+
+    global_count = sum(1 for a in articles if region_of(a) == "global")
+    korean_count = len(articles) - global_count
+    lines = [
+        RULE,
+        "                  Your News Briefing",
+        f"                  [Date: {date:%Y-%m-%d}]",
+        RULE,
+        "",
+        "📊 **News Briefing Summary**",
+        f"- Global News: {global_count} articles ({global_count / len(articles):.0%})",
+        f"- Domestic News: {korean_count} articles ({korean_count / len(articles):.0%})",
+        f"- Topics: {topics}",
+        "",
+        RULE,
+        "                    📰 Major News",
+        RULE,
+        "",
+    ]
+    for i, article in enumerate(articles, 1):
+        flag = "🌍" if region_of(article) == "global" else "🇰🇷"
+        lines += [
+            f"[{i}] {flag} [{article.get('category') or 'General'}] {article.get('title') or article.get('original_title', '')}",
+            f"📅 Published: {_published(article.get('published_date', ''))}",
+            f"📰 Source: {article.get('source', '')}",
+            f"🔗 Original: {article.get('article_url', '')}",
+            "",
+            "📝 Summary:",
+            article.get("full_content_summary", ""),
+        ]
+        if article.get("key_points"):
+            lines += ["", "💡 Key Points:", *(f"• {point}" for point in article["key_points"])]
+        lines += ["", SEPARATOR, ""]
+
+    categories = Counter(article.get("category") or "General" for article in articles)
+    lines += [RULE, "              📋 Distribution by Category", RULE, ""]
+    lines += [f"- {category}: {n} articles" for category, n in categories.most_common()]
+    return "\n".join(lines)
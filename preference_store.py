@@ -0,0 +1,100 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import NamedTuple
+
+DEFAULT_GLOBAL_SHARE = 0.3  # the curator's 3:7 global/Korean split
+DEFAULT_ARTICLE_COUNT = 10
+MAX_ARTICLE_COUNT = 20
+QUERY_CHUNK = 500  # chat ids per query, well under SQLite's bound-parameter limit
+
+
+class Preferences(NamedTuple):
+    chat_id: int
+    categories: tuple[str, ...] = ()  # empty: every category
+    global_share: float = DEFAULT_GLOBAL_SHARE
+    article_count: int = DEFAULT_ARTICLE_COUNT
+
+    def selection_key(self) -> tuple:
+        """What the selection depends on; chats with equal keys get the same briefing."""
+        return (self.categories, self.global_share, self.article_count)
+
+
+class PreferenceStore:
+    """
+    Per-chat briefing preferences in SQLite: category filter, share of global
+    news and number of articles. Chats without a row get the shared curated
+    briefing; chats with one get a briefing selected from the shared article
+    pool.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS preferences (
+                chat_id INTEGER PRIMARY KEY,
+                categories TEXT NOT NULL,
+                global_share REAL NOT NULL,
+                article_count INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def upsert(self, preferences: Preferences):
+        """Creates or replaces the preferences of a chat."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO preferences (chat_id, categories, global_share, article_count) VALUES (?, ?, ?, ?)",
+                (
+                    preferences.chat_id,
+                    json.dumps(list(preferences.categories), ensure_ascii=False),
+                    preferences.global_share,
+                    preferences.article_count,
+                ),
+            )
+
+    def remove(self, chat_id: int) -> bool:
+        """Deletes the preferences of a chat; returns whether it had any."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM preferences WHERE chat_id = ?", (chat_id,))
+            return cursor.rowcount > 0
+
+    def get(self, chat_id: int) -> Preferences | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chat_id, categories, global_share, article_count FROM preferences WHERE chat_id = ?",
+                (chat_id,),
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def get_many(self, chat_ids: list[int]) -> dict[int, Preferences]:
+        """
+        Returns the preferences of those chats that have any, in one query per
+        QUERY_CHUNK chats (SQLite limits the number of bound parameters).
+        """
+        rows = []
+        with self._lock:
+            for start in range(0, len(chat_ids), QUERY_CHUNK):
+                chunk = list(chat_ids[start:start + QUERY_CHUNK])
+                placeholders = ",".join("?" * len(chunk))
+                rows += self._conn.execute(
+                    f"SELECT chat_id, categories, global_share, article_count FROM preferences "
+                    f"WHERE chat_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+        return {row[0]: self._from_row(row) for row in rows}
+
+    @staticmethod
+    def _from_row(row: tuple) -> Preferences:
+        chat_id, categories, global_share, article_count = row
+        return Preferences(chat_id, tuple(json.loads(categories)), global_share, article_count)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
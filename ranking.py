@@ -0,0 +1,148 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TOP_K = 15  # candidates handed to the research agent per tool call
+NEAR_DUPLICATE_THRESHOLD = 0.6  # estimated Jaccard similarity of title shingles
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+RECENCY_HALF_LIFE_HOURS = 12
+COVERAGE_BONUS = 0.25  # score added per extra source reporting the same story
+
+TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "cmpid", "ref"}
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERMUTATIONS)
+]
+
+
+def canonicalize_url(url: str) -> str:
+    """Lowercases scheme/host, drops "www.", tracking parameters, fragments and trailing slashes."""
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(sorted(query)), ""))
+
+
+def _normalize_title(title: str, source: str) -> str:
+    title = unicodedata.normalize("NFKC", title).lower()
+    # Google News appends " - Outlet" to every headline.
+    if " - " in title:
+        head, _, tail = title.rpartition(" - ")
+        if len(tail) < 40:
+            title = head
+    title = title.replace(source.lower(), "")
+    return re.sub(r"[\W_]+", "", title)
+
+
+def _shingles(text: str) -> set[str]:
+    # Character shingles work for Hangul, which has no reliable word boundaries here.
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> list[int]:
+    """Returns the MinHash signature of a string's character shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in _shingles(text)
+    ]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(sig_a: list[int], sig_b: list[int]) -> float:
+    """Estimates the Jaccard similarity of two MinHash signatures."""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def parse_published(value: str) -> datetime | None:
+    """Parses RFC 822 (RSS) or ISO 8601 (Atom) dates into aware datetimes."""
+    if not value:
+        return None
+    try:
+        published = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            published = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published
+
+
+def recency_score(published: datetime | None, now: datetime) -> float:
+    """Halves every RECENCY_HALF_LIFE_HOURS; articles without a date score 0."""
+    if published is None:
+        return 0.0
+    age_hours = max((now - published).total_seconds() / 3600, 0)
+    return 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+
+def rank_articles(
+    articles: list[dict],
+    top_k: int = TOP_K,
+    now: datetime | None = None,
+    weights: dict[str, float] | None = None,
+) -> list[dict]:
+    """
+    Deduplicates and ranks raw RSS articles before they reach the LLM.
+
+    Exact duplicates are found by canonical URL and near-duplicates by MinHash
+    similarity of their titles. Each story keeps its most recent article and is
+    scored by recency plus a bonus for every other source that covered it,
+    multiplied by the highest weight among those sources (default 1).
+    Returns the top_k stories, best first, with their original URLs: the
+    canonical form is only the dedup key, since it can break links.
+    """
+    now = now or datetime.now(timezone.utc)
+    clusters: list[dict] = []
+    seen_urls: set[str] = set()
+
+    for article in articles:
+        url = canonicalize_url(article.get("url", ""))
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+
+        published = parse_published(article.get("published_date", ""))
+        title = _normalize_title(article.get("title", ""), article.get("source", ""))
+        signature = minhash(title) if title else None
+        for cluster in clusters:
+            if (signature is not None and cluster["signature"] is not None
+                    and similarity(signature, cluster["signature"]) >= NEAR_DUPLICATE_THRESHOLD):
+                cluster["sources"].add(article.get("source"))
+                if recency_score(published, now) > recency_score(cluster["published"], now):
+                    cluster.update(article=article, published=published)
+                break
+        else:
+            clusters.append({
+                "article": article,
+                "published": published,
+                "signature": signature,
+                "sources": {article.get("source")},
+            })
+
+    weights = weights or {}
+    for cluster in clusters:
+        score = recency_score(cluster["published"], now) + COVERAGE_BONUS * (len(cluster["sources"]) - 1)
+        cluster["score"] = score * max(weights.get(source, 1.0) for source in cluster["sources"])
+    clusters.sort(key=lambda c: c["score"], reverse=True)
+    return [cluster["article"] for cluster in clusters[:top_k]]
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import threading
+from typing import NamedTuple
+
+
+class Schedule(NamedTuple):
+    chat_id: int
+    hour: int
+    minute: int
+    timezone: str
+
+
+class ScheduleStore:
+    """
+    Durable daily-briefing schedules (one per chat) in SQLite, so subscriptions
+    survive restarts. The bot schedules one job per delivery slot from slots()
+    and looks up the slot's chats with chat_ids_at() when it fires.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schedules (
+                chat_id INTEGER PRIMARY KEY,
+                hour INTEGER NOT NULL,
+                minute INTEGER NOT NULL,
+                timezone TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS schedules_time ON schedules (hour, minute)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def upsert(self, schedule: Schedule):
+        """Creates or replaces the schedule of a chat."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO schedules (chat_id, hour, minute, timezone) VALUES (?, ?, ?, ?)",
+                schedule,
+            )
+
+    def remove(self, chat_id: int) -> bool:
+        """Deletes the schedule of a chat; returns whether one existed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM schedules WHERE chat_id = ?", (chat_id,))
+            return cursor.rowcount > 0
+
+    def get(self, chat_id: int) -> Schedule | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chat_id, hour, minute, timezone FROM schedules WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        return Schedule(*row) if row else None
+
+    def all(self) -> list[Schedule]:
+        """Returns every schedule in one query."""
+        with self._lock:
+            rows = self._conn.execute("SELECT chat_id, hour, minute, timezone FROM schedules").fetchall()
+        return [Schedule(*row) for row in rows]
+
+    def slots(self) -> list[tuple[int, int, str]]:
+        """Returns every distinct (hour, minute, timezone) that has subscribers."""
+        with self._lock:
+            return self._conn.execute("SELECT DISTINCT hour, minute, timezone FROM schedules").fetchall()
+
+    def chat_ids_at(self, hour: int, minute: int, timezone: str) -> list[int]:
+        """Returns the chats subscribed to one delivery slot."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chat_id FROM schedules WHERE hour = ? AND minute = ? AND timezone = ?",
+                (hour, minute, timezone),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any
+
+import metrics
+from storage import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 4
+SCRAPE_TIMEOUT = 45  # seconds per URL
+SCRAPE_BATCH_TIMEOUT = 120  # seconds per scrape_many() call, including URLs waiting for a worker
+CONTENT_CACHE_TTL = 24 * 3600  # seconds
+CONTENT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+class ContentCache:
+    """
+    On-disk cache of scraped articles, one JSON file per URL.
+
+    Entries expire after ttl seconds. When the directory grows past max_bytes,
+    the least recently used files (by mtime, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, directory: str, ttl: float = CONTENT_CACHE_TTL, max_bytes: int = CONTENT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def get(self, url: str) -> dict | None:
+        """Returns the cached article for url if it is younger than the TTL."""
+        path = self._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) < self.ttl:
+                with open(path, encoding="utf-8") as f:
+                    article = json.load(f)
+                os.utime(path)
+                with self._lock:
+                    self.hits += 1
+                metrics.incr("content_cache", result="hit")
+                return article
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            self.misses += 1
+        metrics.incr("content_cache", result="miss")
+        return None
+
+    def put(self, url: str, article: dict):
+        """Stores an article and evicts old entries if the cache is over its size limit."""
+        path = self._path(url)
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            atomic_write_json(path, article)
+            self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+
+
+class BatchScraper:
+    """
+    Scrapes article URLs through one reused Firecrawl client.
+
+    scrape_many() runs up to max_workers scrapes at once, gives each URL
+    timeout seconds (also passed to Firecrawl, so a hung scrape frees its
+    worker) and the whole batch batch_timeout seconds, after which URLs still
+    queued fail. Previously scraped URLs are served from the ContentCache.
+    Point api_url at a local stub server to run without the Firecrawl service.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None,
+        api_url: str,
+        cache: ContentCache | None = None,
+        max_workers: int = MAX_WORKERS,
+        timeout: float = SCRAPE_TIMEOUT,
+        batch_timeout: float = SCRAPE_BATCH_TIMEOUT,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.cache = cache
+        self.timeout = timeout
+        self.batch_timeout = batch_timeout
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape")
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                from firecrawl import Firecrawl
+
+                self._client = Firecrawl(api_key=self.api_key, api_url=self.api_url)
+            return self._client
+
+    def scrape(self, url: str) -> dict[str, Any]:
+        """Scrapes a single URL (or returns its cached content)."""
+        return self.scrape_many([url])[0]
+
+    def scrape_many(self, urls: list[str]) -> list[dict[str, Any]]:
+        """Scrapes URLs concurrently and returns one result per URL, in order."""
+        deadline = time.monotonic() + self.batch_timeout
+        results: dict[str, dict[str, Any]] = {}
+        started: dict[str, float] = {}
+        futures = {}
+        for url in dict.fromkeys(urls):
+            cached = self.cache.get(url) if self.cache is not None else None
+            if cached is not None:
+                results[url] = cached
+            else:
+                futures[self._pool.submit(metrics.propagate(self._timed_scrape), url, started)] = url
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    logger.warning(f"Error scraping URL {url}: {e}")
+                    results[url] = _error(url, str(e))
+                    continue
+                if self.cache is not None:
+                    self.cache.put(url, results[url])
+
+            # The timeout counts from when a URL starts, not while it waits for a worker.
+            now = time.monotonic()
+            for future in list(pending):
+                url = futures[future]
+                if url in started and now - started[url] > self.timeout:
+                    pending.discard(future)
+                    logger.warning(f"Timed out scraping URL {url} after {self.timeout:g}s")
+                    results[url] = _error(url, f"timed out after {self.timeout:g}s")
+            if pending and now > deadline:
+                for future in pending:
+                    future.cancel()  # frees the worker slot if the URL has not started
+                    url = futures[future]
+                    logger.warning(f"Batch timed out before URL {url} was scraped")
+                    results[url] = _error(url, f"batch timed out after {self.batch_timeout:g}s")
+                pending = set()
+
+        return [results[url] for url in urls]
+
+    def _timed_scrape(self, url: str, started: dict[str, float]) -> dict[str, Any]:
+        started[url] = time.monotonic()
+        with metrics.timer("scrape"):
+            return self._scrape_one(url)
+
+    def _scrape_one(self, url: str) -> dict[str, Any]:
+        response: Any = self.client.scrape(
+            url=url, formats=["markdown"], only_main_content=True, timeout=int(self.timeout * 1000)
+        )
+        metadata = response.metadata_typed if hasattr(response, "metadata_typed") else None
+        return {
+            "title": getattr(metadata, "title", None) or "No Title",
+            "url": url,
+            "content": response.markdown or response.summary or "No Content",
+        }
+
+
+def _error(url: str, reason: str) -> dict[str, str]:
+    return {
+        "title": "Error",
+        "url": url,
+        "content": f"Failed to scrape content: {reason}",
+    }
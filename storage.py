@@ -0,0 +1,35 @@
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Loads a JSON file, returning default when it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def atomic_write_text(path: str, text: str):
+    """
+    Writes text via a temporary file and os.replace, so readers (and a crash
+    mid-write) never see a half-written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, data: Any):
+    """Writes data as JSON atomically (see atomic_write_text)."""
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
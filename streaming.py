@@ -0,0 +1,111 @@
+import logging
+import threading
+from typing import Any, Callable
+
+from task_outputs import extract_items
+
+logger = logging.getLogger(__name__)
+
+# Crew tasks in the order their results are streamed to the chat.
+STAGES = (
+    "research_global_news_task",
+    "research_korean_news_task",
+    "edit_and_summarize_articles_task",
+    "curate_final_news_task",
+)
+MAX_HEADLINES = 10
+
+StageCallback = Callable[[str, str], None]
+
+
+def _articles(raw: str) -> list[dict]:
+    return [item for item in extract_items(raw) if isinstance(item, dict)]
+
+
+class BriefingProgress:
+    """
+    Publishes the outputs of a briefing run's tasks, as they complete, to the
+    chats waiting for that run. Runs are keyed like the briefing executor's jobs,
+    so every chat joining the same run sees the same progress; late subscribers
+    get the stages completed so far replayed immediately.
+
+    publish() is called from the crew's worker thread; callbacks run on that
+    thread and must hand work to their own event loop.
+    """
+
+    def __init__(self):
+        self._stages: dict[str, dict[str, str]] = {}
+        self._subscribers: dict[str, list[StageCallback]] = {}
+        self._lock = threading.Lock()
+
+    def callback_for(self, key: str) -> Callable[[Any], None]:
+        """Returns a crewai task_callback that publishes each TaskOutput under key."""
+
+        def on_task_output(output: Any):
+            # Structured outputs are published as validated, with invalid items already dropped.
+            text = output.pydantic.model_dump_json() if output.pydantic is not None else output.raw
+            self.publish(key, output.name or "", text)
+
+        return on_task_output
+
+    def publish(self, key: str, stage: str, text: str):
+        with self._lock:
+            self._stages.setdefault(key, {})[stage] = text
+            subscribers = list(self._subscribers.get(key, ()))
+        for callback in subscribers:
+            try:
+                callback(stage, text)
+            except Exception:
+                logger.exception(f"Progress subscriber for {key} failed")
+
+    def subscribe(self, key: str, callback: StageCallback) -> Callable[[], None]:
+        """Registers callback for key's stages and returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+            completed = list(self._stages.get(key, {}).items())
+        for stage, text in completed:
+            callback(stage, text)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._subscribers.pop(key, None)
+
+        return unsubscribe
+
+    def finish(self, key: str):
+        """Drops the stages of a finished run."""
+        with self._lock:
+            self._stages.pop(key, None)
+
+
+def render_progress(stages: dict[str, str], limit: int) -> str:
+    """
+    Renders the stages completed so far as one progress message of at most limit
+    characters: headlines once research is done, replaced by the editor's
+    summaries once those are ready.
+    """
+    if "curate_final_news_task" in stages:
+        lines = ["✅ News briefing ready, see below."]
+    else:
+        lines = [f"⏳ Preparing news briefing ({len(stages)}/{len(STAGES)} steps done)..."]
+    summaries = _articles(stages.get("edit_and_summarize_articles_task", ""))
+    if summaries:
+        lines += ["", f"📝 Summaries of {len(summaries)} articles (the final selection follows):"]
+        lines += [f"• {item.get('title', 'Untitled')}: {item.get('full_content_summary', '')}" for item in summaries]
+    else:
+        for stage, heading in (("research_global_news_task", "🌍 Global headlines"), ("research_korean_news_task", "🇰🇷 Korean headlines")):
+            articles = _articles(stages.get(stage, ""))[:MAX_HEADLINES]
+            if articles:
+                lines += ["", f"{heading}:"]
+                lines += [f"• {item.get('title', 'Untitled')}" + (f" ({item['source']})" if item.get("source") else "") for item in articles]
+
+    text = ""
+    for line in lines:
+        if len(text) + len(line) + 1 > limit:
+            break
+        text += line + "\n"
+    return text.rstrip()
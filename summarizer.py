@@ -0,0 +1,225 @@
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.utilities.token_counter_callback import TokenCalcHandler
+from pydantic import BaseModel, Field, field_validator
+
+import metrics
+from article_store import ArticleStore
+from llm_cache import CachedLLM
+from task_outputs import coerce_score, extract_items, validate_items
+from tokens import estimate_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+BATCH_TOKEN_BUDGET = 6000  # prompt tokens of article text per LLM call
+MAX_ARTICLE_TOKENS = 1500  # longer articles are truncated
+MAX_CONCURRENCY = 4  # LLM calls in flight at once
+MAX_RETRIES = 2  # extra attempts per failed batch
+
+PROMPT = """You are a senior news editor. For every article below, translate the title into Korean and
+summarize the article content in Korean in 2-3 sentences, with up to 3 key points.
+Keep every article, in the given order, and copy article_url exactly.
+
+Reply with only a JSON object of the form:
+{{"articles": [{{"original_title": "...", "title": "Korean title", "published_date": "...",
+"source": "...", "category": "Politics/Economy/Society/International/Sports/Culture etc.",
+"original_summary": "RSS summary", "full_content_summary": "Korean summary",
+"key_points": ["...", "..."], "article_url": "...", "importance_score": 1-10}}]}}
+
+Articles:
+{articles}"""
+
+
+class ArticleSummary(BaseModel):
+    original_title: str
+    title: str
+    published_date: str = ""
+    source: str = ""
+    category: str = ""
+    original_summary: str = ""
+    full_content_summary: str
+    key_points: list[str] = Field(default_factory=list)
+    article_url: str
+    importance_score: int = Field(ge=1, le=10)
+    region: str = ""  # "global" or "korean", tagged by the summarize tool
+
+    @field_validator("importance_score", mode="before")
+    @classmethod
+    def repair_score(cls, value: Any) -> int:
+        return coerce_score(value)
+
+
+class SummaryBatch(BaseModel):
+    articles: list[ArticleSummary]
+
+
+class BatchFailed(Exception):
+    pass
+
+
+def make_batches(articles: list[dict], budget: int = BATCH_TOKEN_BUDGET) -> list[list[dict]]:
+    """Packs articles, in order, into batches whose estimated prompt tokens stay within budget."""
+    batches: list[list[dict]] = []
+    current: list[dict] = []
+    used = 0
+    for article in articles:
+        cost = estimate_tokens(json.dumps(article, ensure_ascii=False))
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(article)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class BatchSummarizer:
+    """
+    Map-reduce summarization of scraped articles.
+
+    Articles are packed into token-budgeted batches (map), each batch is
+    summarized by one LLM call, with at most max_concurrency calls in flight,
+    and its reply is validated article by article against ArticleSummary:
+    repairable fields are repaired locally and invalid summaries dropped. Only
+    the articles of a batch that are still missing are retried, and the
+    validated summaries are merged back in input order (reduce). llm is anything
+    with a call(messages) -> str method, such as crewai's LLM.
+
+    With an ArticleStore, articles whose content is unchanged since an earlier
+    run reuse their memoized summary and only new or changed articles are sent
+    to the LLM.
+
+    The tokens of its LLM calls are recorded in the current run's metrics
+    against agent, like those of the crew's agents.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        batch_token_budget: int = BATCH_TOKEN_BUDGET,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        store: ArticleStore | None = None,
+        agent: str = "summarizer",
+    ):
+        self.llm = llm
+        self.store = store
+        self.agent = agent
+        self.batch_token_budget = batch_token_budget
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
+    def summarize(self, articles: list[dict]) -> list[dict]:
+        """
+        Summarizes articles (research metadata plus scraped "content") and returns
+        one summary dict per article. Articles of batches that still fail after
+        their retries are left out.
+        """
+        summaries = self.summaries_by_url(articles)
+        return [summaries[article["url"]] for article in articles if article["url"] in summaries]
+
+    def summaries_by_url(self, articles: list[dict]) -> dict[str, dict]:
+        """
+        Like summarize(), but returns the summaries by the URL of their input
+        article. A memoized summary may carry the article_url of an earlier run.
+        """
+        memoized: dict[str, dict] = {}
+        if self.store is not None:
+            self.store.record(articles)
+            memoized = self.store.summaries(articles)
+            metrics.incr("summary_memo", len(memoized), result="hit")
+            metrics.incr("summary_memo", len(articles) - len(memoized), result="miss")
+        fresh = {article["url"]: article for article in articles if article["url"] not in memoized}
+
+        prepared = [
+            {
+                "title": article.get("title", ""),
+                "article_url": url,
+                "published_date": article.get("published_date", ""),
+                "source": article.get("source", ""),
+                "category": article.get("category", ""),
+                "original_summary": article.get("summary", ""),
+                "content": truncate_tokens(article.get("content", ""), MAX_ARTICLE_TOKENS),
+            }
+            for url, article in fresh.items()
+        ]
+        batches = make_batches(prepared, self.batch_token_budget)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="summarize") as pool:
+            futures = [pool.submit(metrics.propagate(self._summarize_batch), batch) for batch in batches]
+            results = [future.result() for future in futures]
+
+        summaries = dict(memoized)
+        for batch_summaries in results:
+            if not batch_summaries:
+                continue
+            batch_articles = [fresh[summary["article_url"]] for summary in batch_summaries]
+            summaries.update((article["url"], summary) for article, summary in zip(batch_articles, batch_summaries))
+            if self.store is not None:
+                self.store.put_summaries(batch_articles, batch_summaries)
+        return summaries
+
+    def _summarize_batch(self, batch: list[dict]) -> list[dict]:
+        """Summarizes a batch, retrying only its missing articles; returns the summaries in batch order."""
+        summaries: dict[str, dict] = {}
+        remaining = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.incr("summarize_batch_retries")
+            started = time.monotonic()
+            try:
+                summaries.update(self._call(remaining))
+                metrics.observe("summarize_batch", time.monotonic() - started)
+            except BatchFailed as e:
+                logger.warning(f"Summary batch of {len(remaining)} articles failed (attempt {attempt + 1}): {e}")
+            remaining = [article for article in batch if article["article_url"] not in summaries]
+            if not remaining:
+                break
+        else:
+            metrics.incr("summarize_batch_failures")
+            logger.error(f"Dropping {len(remaining)} articles after {self.max_retries + 1} failed attempts")
+        return [summaries[article["article_url"]] for article in batch if article["article_url"] in summaries]
+
+    def _call(self, batch: list[dict]) -> dict[str, dict]:
+        """
+        Returns the valid summaries in the reply by article URL; raises BatchFailed
+        if there are none. Behind a CachedLLM, only replies that summarize the
+        whole batch are cached, so a retry never gets an invalid reply back.
+        """
+        prompt = PROMPT.format(articles=json.dumps(batch, ensure_ascii=False, indent=1))
+        urls = {article["article_url"] for article in batch}
+        parsed: dict[str, dict[str, dict]] = {}
+
+        def summaries_in(reply: str) -> dict[str, dict]:
+            if reply not in parsed:
+                parsed[reply] = {
+                    summary.article_url: summary.model_dump()
+                    for summary in validate_items(extract_items(reply), ArticleSummary, "summarize")
+                    if summary.article_url in urls
+                }
+            return parsed[reply]
+
+        messages = [{"role": "user", "content": prompt}]
+        # These calls bypass the agents' token accounting, so they count their own.
+        token_process = TokenProcess()
+        callbacks = [TokenCalcHandler(token_process)]
+        try:
+            if isinstance(self.llm, CachedLLM):
+                reply = self.llm.call(
+                    messages, callbacks=callbacks, validate=lambda reply: len(summaries_in(reply)) == len(urls)
+                )
+            else:
+                reply = self.llm.call(messages, callbacks=callbacks)
+        except Exception as e:
+            raise BatchFailed(f"LLM call failed: {e}") from e
+        finally:
+            metrics.record_usage(token_process, self.agent)
+        valid = summaries_in(reply)
+        if not valid:
+            raise BatchFailed("reply has no valid summaries")
+        return valid
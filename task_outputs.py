@@ -0,0 +1,113 @@
+import json
+import logging
+import re
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMPORTANCE = 5
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+Item = TypeVar("Item", bound=BaseModel)
+
+
+def coerce_score(value: Any) -> int:
+    """
+    Repairs an importance score to an int from 1 to 10: "8", "8/10" and 8.4 become
+    8, out-of-range scores are clamped and unreadable ones get DEFAULT_IMPORTANCE.
+    """
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        value = match.group() if match else None
+    try:
+        score = round(float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_IMPORTANCE
+    return min(max(score, 1), 10)
+
+
+class ResearchArticle(BaseModel):
+    title: str
+    url: str
+    summary: str = ""
+    published_date: str = ""
+    source: str = ""
+    category: str = ""
+    importance_score: int = DEFAULT_IMPORTANCE
+
+    @field_validator("importance_score", mode="before")
+    @classmethod
+    def repair_score(cls, value: Any) -> int:
+        return coerce_score(value)
+
+    @field_validator("url")
+    @classmethod
+    def absolute_url(cls, url: str) -> str:
+        url = url.strip()
+        if not url.startswith(("http://", "https://")):
+            raise ValueError("not an absolute URL")
+        return url
+
+
+class ResearchArticles(BaseModel):
+    articles: list[ResearchArticle]
+
+
+def extract_items(text: str) -> list[Any]:
+    """
+    Finds the list of items in an LLM reply: a JSON list, or an object holding one
+    (such as {"articles": [...]}), tolerating code fences and surrounding prose.
+    Returns [] when there is none.
+    """
+    text = _FENCE.sub("", text.strip())
+    candidates = [text]
+    for opening, closing in ("{}", "[]"):
+        start, end = text.find(opening), text.rfind(closing)
+        if start != -1 and end > start:
+            candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate, strict=False)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            parsed = parsed.get("articles", next(
+                (value for value in parsed.values() if isinstance(value, list) and value and isinstance(value[0], dict)),
+                None,
+            ))
+        if isinstance(parsed, list):
+            return parsed
+    return []
+
+
+def validate_items(items: list[Any], model: type[Item], stage: str) -> list[Item]:
+    """
+    Validates items one by one against model, so one malformed item costs only
+    itself: null fields fall back to their defaults, fields the model can
+    repair (such as scores) are repaired, and items that still fail (no URL, no
+    title) are dropped and counted in the invalid_items metric.
+    """
+    valid = []
+    for item in items:
+        if isinstance(item, dict):
+            item = {key: value for key, value in item.items() if value is not None}
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as e:
+            logger.warning(f"Dropping invalid {stage} item: {e.error_count()} validation errors")
+            metrics.incr("invalid_items", stage=stage)
+    return valid
+
+
+def output_articles(output: Any) -> list[dict]:
+    """The articles of a task output as dicts: its validated model's, else those parsed from its raw text."""
+    if output is None:
+        return []
+    if isinstance(output.pydantic, BaseModel):
+        return output.pydantic.model_dump()["articles"]
+    return [item for item in extract_items(output.raw) if isinstance(item, dict)]
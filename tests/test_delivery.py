@@ -0,0 +1,42 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from delivery import Broadcaster
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent: list[tuple[int, float]] = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, time.monotonic()))
+        return SimpleNamespace(message_id=len(self.sent))
+
+
+def test_per_chat_limit_holds_across_sends():
+    bot = RecordingBot()
+    broadcaster = Broadcaster(global_rate=1000, per_chat_rate=20, per_chat_burst=1)
+
+    async def send_twice():
+        await broadcaster.send(bot, 1, ["first"])
+        await broadcaster.send(bot, 1, ["second"])
+
+    asyncio.run(send_twice())
+    (_, first), (_, second) = bot.sent
+    assert second - first >= 0.04  # the second send waited for the chat's bucket to refill
+
+
+def test_only_idle_chat_buckets_are_dropped():
+    bot = RecordingBot()
+    broadcaster = Broadcaster(global_rate=1000, per_chat_rate=20, per_chat_burst=1, max_chat_buckets=1)
+
+    async def send_to(chat_ids):
+        for chat_id in chat_ids:
+            await broadcaster.send(bot, chat_id, ["hello"])
+
+    asyncio.run(send_to([1, 2]))
+    assert list(broadcaster._chat_buckets) == [1, 2]  # chat 1's bucket was still refilling
+    time.sleep(0.1)
+    asyncio.run(send_to([3]))
+    assert list(broadcaster._chat_buckets) == [3]
@@ -0,0 +1,43 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from feed_fetcher import FeedFetcher
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.end_headers()
+        self.wfile.write(b"<rss/>")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_per_host_limit_covers_reading_the_body():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    reading, most_reading = 0, 0
+    lock = threading.Lock()
+
+    def parse(name, response):
+        nonlocal reading, most_reading
+        with lock:
+            reading += 1
+            most_reading = max(most_reading, reading)
+        time.sleep(0.1)
+        response.content
+        with lock:
+            reading -= 1
+        return [name]
+
+    try:
+        fetcher = FeedFetcher(max_workers=4, per_host_limit=1)
+        items = fetcher.fetch_all({f"feed{i}": f"{base}/{i}" for i in range(4)}, parse)
+    finally:
+        server.shutdown()
+    assert items == ["feed0", "feed1", "feed2", "feed3"]
+    assert most_reading == 1
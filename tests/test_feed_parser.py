@@ -0,0 +1,30 @@
+from feed_parser import _chunks, parse_feed
+
+EUC_KR_FEED = """<?xml version="1.0" encoding="euc-kr"?>
+<rss version="2.0"><channel><title>경제</title>
+<item><title>코스피 상승 마감</title><link>https://example.com/1</link><description>외국인 순매수</description></item>
+<item><title>환율 하락</title><link>https://example.com/2</link><description>원화 강세</description></item>
+</channel></rss>
+""".encode("euc-kr")
+
+
+def chunked(document: bytes, size: int) -> list[bytes]:
+    return [document[i:i + size] for i in range(0, len(document), size)]
+
+
+def test_euc_kr_feed_is_parsed_incrementally():
+    articles = parse_feed("연합뉴스", chunked(EUC_KR_FEED, 64), limit=10)
+    assert [article.title for article in articles] == ["코스피 상승 마감", "환율 하락"]
+    assert articles[0].summary == "외국인 순매수"
+
+
+def test_charset_header_is_used_without_a_declaration():
+    document = EUC_KR_FEED.split(b"\n", 1)[1]
+    articles = parse_feed("연합뉴스", chunked(document, 7), limit=1, charset="EUC-KR")
+    assert [article.title for article in articles] == ["코스피 상승 마감"]
+
+
+def test_euc_kr_feed_reaches_expat_as_utf8():
+    document = b"".join(_chunks(chunked(EUC_KR_FEED, 64), None))
+    assert document.startswith(b'<?xml version="1.0" encoding="utf-8"?>')
+    assert "코스피".encode("utf-8") in document
@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+import metrics
+from llm_cache import CachedLLM, LLMCache
+from summarizer import BatchSummarizer
+
+
+class ScriptedLLM:
+    """Answers with the given replies in turn; a reply of None echoes a valid summary batch."""
+
+    model = "scripted"
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def call(self, messages, **kwargs):
+        self.calls += 1
+        reply = self.replies.pop(0) if self.replies else None
+        if reply is not None:
+            return reply
+        batch = json.loads(messages[-1]["content"].split("Articles:\n", 1)[1])
+        return json.dumps({"articles": [
+            {
+                "original_title": article["title"],
+                "title": article["title"],
+                "full_content_summary": "요약",
+                "article_url": article["article_url"],
+                "importance_score": 5,
+            }
+            for article in batch
+        ]})
+
+
+ARTICLES = [{"title": f"Title {i}", "url": f"https://example.com/{i}", "content": "Text"} for i in range(2)]
+
+
+def test_invalid_reply_is_not_cached_and_retry_reaches_the_model(tmp_path):
+    llm = ScriptedLLM("Sorry, I cannot comply.")
+    cache = LLMCache(str(tmp_path / "llm_cache.db"))
+    summaries = BatchSummarizer(CachedLLM(llm, cache)).summarize(ARTICLES)
+
+    assert [summary["article_url"] for summary in summaries] == [article["url"] for article in ARTICLES]
+    assert llm.calls == 2
+
+    # The valid reply was cached: a second run makes no model call.
+    again = BatchSummarizer(CachedLLM(llm, cache)).summarize(ARTICLES)
+    assert again == summaries
+    assert llm.calls == 2
+
+
+def test_cached_reply_failing_validation_is_not_served(tmp_path):
+    llm = ScriptedLLM("first", "second")
+    cached = CachedLLM(llm, LLMCache(str(tmp_path / "llm_cache.db")))
+    messages = [{"role": "user", "content": "prompt"}]
+
+    assert cached.call(messages) == "first"
+    assert cached.call(messages, validate=lambda reply: reply == "second") == "second"
+    assert cached.call(messages, validate=lambda reply: reply == "second") == "second"
+    assert llm.calls == 2
+
+
+class MeteredLLM(ScriptedLLM):
+    """Reports 100 prompt and 20 completion tokens per call to its callbacks, as crewai's LLM does."""
+
+    def call(self, messages, callbacks=None, **kwargs):
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20, prompt_tokens_details=None)
+        for callback in callbacks or []:
+            callback.log_success_event(kwargs={}, response_obj={"usage": usage}, start_time=0, end_time=0)
+        return super().call(messages, **kwargs)
+
+
+def test_summarizer_tokens_are_recorded_and_cache_hits_cost_none(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm_cache.db"))
+    run = metrics.start_run()
+    BatchSummarizer(CachedLLM(MeteredLLM(), cache), agent="Senior Editor").summarize(ARTICLES)
+    BatchSummarizer(CachedLLM(MeteredLLM(), cache), agent="Senior Editor").summarize(ARTICLES)
+    metrics.finish_run(str(tmp_path))
+
+    assert run.counters[("llm_prompt_tokens", (("agent", "Senior Editor"),))] == 100
+    assert run.counters[("llm_completion_tokens", (("agent", "Senior Editor"),))] == 20
+    assert run.total("llm_requests") == 1
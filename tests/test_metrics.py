@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+
+def test_overlapping_runs_stay_separate(tmp_path):
+    pool = ThreadPoolExecutor(max_workers=2)
+    first_started, second_started = threading.Event(), threading.Event()
+    results = {}
+
+    def run(name: str, started: threading.Event, other_started: threading.Event, count: int):
+        metrics.start_run()
+        started.set()
+        other_started.wait(5)  # both runs are active from here on
+        for _ in range(count):
+            metrics.incr("articles")
+            pool.submit(metrics.propagate(metrics.incr), "pooled").result()
+        with metrics.timer("stage"):
+            pass
+        results[name] = metrics.finish_run(str(tmp_path))
+
+    threads = [
+        threading.Thread(target=run, args=("first", first_started, second_started, 2)),
+        threading.Thread(target=run, args=("second", second_started, first_started, 3)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["first"] is not None and results["second"] is not None
+    assert results["first"].total("articles") == 2
+    assert results["first"].total("pooled") == 2
+    assert results["second"].total("articles") == 3
+    assert results["second"].total("pooled") == 3
+    assert len((tmp_path / "metrics.jsonl").read_text().splitlines()) == 2
+
+
+def test_recording_without_a_run_is_a_no_op(tmp_path):
+    metrics.incr("articles")
+    assert metrics.finish_run(str(tmp_path)) is None
+
+
+def test_read_last_run_returns_the_latest_export(tmp_path):
+    assert metrics.read_last_run(str(tmp_path)) is None
+    for count in (1, 2):
+        metrics.start_run()
+        metrics.incr("articles", count)
+        run = metrics.finish_run(str(tmp_path))
+    last = metrics.read_last_run(str(tmp_path))
+    assert last["run_id"] == run.run_id
+    assert metrics.run_summary(last) == run.summary()
@@ -0,0 +1,44 @@
+import os
+import threading
+
+# No telemetry or trace prompt from crewai during the test.
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+
+from crewai import Agent, Crew
+from crewai.llms.base_llm import BaseLLM
+
+from news_crew import NewsTask
+
+
+class FailingLLM(BaseLLM):
+    def call(self, messages, *args, **kwargs):
+        raise RuntimeError("LLM unavailable")
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+def test_failing_async_task_makes_kickoff_raise():
+    agent = Agent(role="Researcher", goal="Research", backstory="Researcher", llm=FailingLLM(model="failing"),
+                  max_retry_limit=0)
+    crew = Crew(
+        agents=[agent],
+        tasks=[
+            NewsTask(description="Research", expected_output="Articles", agent=agent, async_execution=True),
+            NewsTask(description="Summarize", expected_output="Summary", agent=agent),
+        ],
+    )
+    outcome = {}
+
+    def kickoff():
+        try:
+            crew.kickoff()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=kickoff, daemon=True)
+    thread.start()
+    thread.join(30)
+    assert not thread.is_alive(), "kickoff is still waiting on the failed task"
+    assert "LLM unavailable" in str(outcome["error"])
@@ -0,0 +1,15 @@
+from preference_store import QUERY_CHUNK, PreferenceStore, Preferences
+
+
+def test_get_many_spans_several_queries(tmp_path):
+    store = PreferenceStore(str(tmp_path / "bot.db"))
+    chat_ids = list(range(QUERY_CHUNK * 70))  # more ids than SQLite binds in one statement
+    for chat_id in (0, QUERY_CHUNK, len(chat_ids) - 1):
+        store.upsert(Preferences(chat_id, ("Markets",)))
+
+    found = store.get_many(chat_ids)
+
+    assert sorted(found) == [0, QUERY_CHUNK, len(chat_ids) - 1]
+    assert found[QUERY_CHUNK].categories == ("Markets",)
+    assert store.get_many([]) == {}
+    store.close()
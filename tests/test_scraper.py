@@ -0,0 +1,33 @@
+import threading
+
+from scraper import BatchScraper
+
+
+class HungClient:
+    """Firecrawl stand-in whose scrapes hang until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.timeouts = []
+
+    def scrape(self, url, **kwargs):
+        self.timeouts.append(kwargs.get("timeout"))
+        self.release.wait(10)
+        raise TimeoutError("released")
+
+
+def test_hung_scrapes_do_not_hold_up_the_batch():
+    client = HungClient()
+    scraper = BatchScraper(None, "http://localhost", max_workers=2, timeout=0.5, batch_timeout=1.5)
+    scraper._client = client
+    try:
+        results = scraper.scrape_many([f"https://example.com/{i}" for i in range(4)])
+    finally:
+        client.release.set()
+    assert [result["content"] for result in results] == [
+        "Failed to scrape content: timed out after 0.5s",
+        "Failed to scrape content: timed out after 0.5s",
+        "Failed to scrape content: batch timed out after 1.5s",
+        "Failed to scrape content: batch timed out after 1.5s",
+    ]
+    assert client.timeouts == [500, 500]
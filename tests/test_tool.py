@@ -0,0 +1,41 @@
+import json
+
+import tool
+from article_store import ArticleStore
+from summarizer import BatchSummarizer
+
+
+class EchoLLM:
+    """Summarizes every article of the prompt."""
+
+    model = "echo"
+
+    def call(self, messages, **kwargs):
+        batch = json.loads(messages[-1]["content"].split("Articles:\n", 1)[1])
+        return json.dumps({"articles": [
+            {
+                "original_title": article["title"],
+                "title": article["title"],
+                "full_content_summary": "요약",
+                "article_url": article["article_url"],
+                "importance_score": 5,
+            }
+            for article in batch
+        ]})
+
+
+def test_memoized_summary_under_another_url_keeps_its_region(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool.batch_scraper, "scrape_many", lambda urls: [
+        {"title": "Page", "url": url, "content": "Same story"} for url in urls
+    ])
+    summarizer = BatchSummarizer(EchoLLM(), store=ArticleStore(str(tmp_path / "articles.db")))
+
+    def summarize(url):
+        articles = [{"title": "Story", "url": url, "source": "BBC"}]
+        summarize_tool = tool.SummarizeArticlesTool(load_articles=lambda: articles, summarizer=summarizer)
+        return json.loads(summarize_tool._run())["articles"]
+
+    summarize("https://example.com/story?utm_source=rss")
+    [summary] = summarize("https://example.com/story")
+    assert summary["article_url"] == "https://example.com/story?utm_source=rss"  # memoized from the first run
+    assert summary["region"] == "global"
@@ -0,0 +1,20 @@
+import threading
+
+import crew_runner
+from briefing_queue import QUEUED, BriefingQueue
+from worker import Worker
+
+
+def test_hung_job_is_given_up_and_requeued(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(crew_runner, "kickoff_crew", lambda: release.wait(10))
+    queue = BriefingQueue(str(tmp_path / "queue.db"), lease_seconds=0.3)
+    job_id = queue.enqueue("2026-10-17T08")
+    try:
+        assert Worker(queue, "worker-1", job_timeout=1).run_once()
+    finally:
+        release.set()
+    job = queue.get(job_id)
+    assert job.status == QUEUED
+    assert job.error == "JobTimedOut: timed out after 1s"
+    queue.close()
@@ -0,0 +1,10 @@
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 UTF-8 bytes per token, so Hangul counts ~0.75 per character)."""
+    return len(text.encode("utf-8")) // 4 + 1
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to about max_tokens (see estimate_tokens), marking the cut with ' ...'."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text.encode("utf-8")[: max_tokens * 4].decode("utf-8", errors="ignore") + " ..."
@@ -1,104 +1,99 @@
-from pydantic import BaseModel, Field
+import json
+import os
+from pydantic import BaseModel
 from crewai.tools import BaseTool
-from firecrawl import Firecrawl
-import feedparser
-import requests
-from env import FIRECRAWL_API_KEY
+from article_store import ArticleStore
+from env import FIRECRAWL_API_KEY, FIRECRAWL_API_URL
+import metrics
+from news_feeds import SUMMARY_TOKEN_BUDGET, feed_registry, ranked_articles, strip_html
+from scraper import BatchScraper, ContentCache
+from summarizer import SummaryBatch
+from tokens import estimate_tokens, truncate_tokens
 from typing import Type, Any
 
-def _get_rss(rss_url:dict[str,str], each:int=10):
-    all_articles = []
-    for source_name, url in rss_url.items():
-        try:
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            feed = feedparser.parse(response.text)
+DATA_DIR = os.getenv("DATA_DIR", "data")
 
-            for entry in feed.entries[:each]:
-                all_articles.append({
-                    "source": source_name,
-                    "title": getattr(entry, "title", "No title"),
-                    "url": getattr(entry, "link", "No link"),
-                    "summary": getattr(entry, "summary", "No summary"),
-                    "published_date": getattr(entry, "published", "No published date"),
-                    "category": getattr(entry, "category", "General"),  # Added missing category field
-                    "importance_score": 0  # Added missing importance_score field
-                })
-        except Exception as e:
-            print(f"Error fetching RSS from {source_name}: {str(e)}")
-            continue
-    return all_articles
+batch_scraper = BatchScraper(
+    FIRECRAWL_API_KEY, FIRECRAWL_API_URL, cache=ContentCache(os.path.join(DATA_DIR, "content_cache"))
+)
+article_store = ArticleStore(
+    os.path.join(DATA_DIR, "articles.db"), retention_days=float(os.getenv("ARTICLE_RETENTION_DAYS", "7"))
+)
+
+def _research(region: str, tool_name: str) -> str:
+    return _compact_articles(ranked_articles(region), tool_name)
+
+def _compact_articles(articles: list[dict], tool_name: str) -> str:
+    """
+    Serializes articles for the research agent as compact JSON: HTML stripped
+    from summaries, summaries cut to SUMMARY_TOKEN_BUDGET, and placeholder
+    fields (importance_score 0, category "General") dropped. Records the
+    estimated prompt tokens saved against sending the raw article dicts.
+    """
+    compact = []
+    for article in articles:
+        item = {key: article[key] for key in ("title", "url", "source", "published_date") if article.get(key)}
+        if article.get("category") and article["category"] != "General":
+            item["category"] = article["category"]
+        summary = truncate_tokens(strip_html(article.get("summary", "")), SUMMARY_TOKEN_BUDGET)
+        if summary and summary != "No summary":
+            item["summary"] = summary
+        compact.append(item)
+    text = json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+    tokens = estimate_tokens(text)
+    metrics.incr("tool_output_tokens", tokens, tool=tool_name)
+    metrics.incr("prompt_tokens_saved", max(estimate_tokens(str(articles)) - tokens, 0), source=tool_name)
+    return text
 
 class GlobalNewsResearchToolInput(BaseModel):
     pass  # No input parameters needed
 
 class GlobalNewsResearchTool(BaseTool):
     name: str = "global_news_research_tool"
-    description: str = "Fetch the latest global economic and financial news from RSS feeds (Google News, BBC, CNN). Automatically fetches 10 articles per source. Returns a list of articles with title, url, summary, published_date, source, category, and importance_score."
+    description: str = "Fetch the latest global economic and financial news from the configured global RSS feeds (such as Google News, BBC and CNN). Returns a compact JSON list of deduplicated articles ranked best first with title, url, source, published_date, optional category and a short summary."
     input_schema: Type[BaseModel] = GlobalNewsResearchToolInput
 
-    def _run(self) -> list[dict]:
-        global_url = {
-            "Google News": "https://news.google.com/rss/search?q=global+economy+finance&hl=en-US&gl=US&ceid=US:en",
-            "BBC": "https://feeds.bbci.co.uk/news/business/rss.xml",
-            "CNN": "https://rss.cnn.com/rss/money_news_international.rss",
-        }
-        return _get_rss(global_url, each=10)
+    def _run(self) -> str:
+        return _research("global", self.name)
 
 class KoreanNewsResearchToolInput(BaseModel):
     pass  # No input parameters needed
 
 class KoreanNewsResearchTool(BaseTool):
     name: str = "korean_news_research_tool"
-    description: str = "Fetch the latest Korean economic and financial news from RSS feeds (연합뉴스, 조선일보, 동아일보, 매일경제, 한국경제). Automatically fetches 10 articles per source. Returns a list of articles with title, url, summary, published_date, source, category, and importance_score."
+    description: str = "Fetch the latest Korean economic and financial news from the configured Korean RSS feeds (such as 연합뉴스, 조선일보, 동아일보, 매일경제 and 한국경제). Returns a compact JSON list of deduplicated articles ranked best first with title, url, source, published_date, optional category and a short summary."
     input_schema: Type[BaseModel] = KoreanNewsResearchToolInput
 
-    def _run(self) -> list[dict]:
-        korean_rss_feeds = {
-            "연합뉴스": "https://www.yna.co.kr/RSS/economy.xml",  # Changed to economy feed
-            "조선일보": "https://www.chosun.com/arc/outboundfeeds/rss/economy/?outputType=xml",
-            "동아일보": "https://rss.donga.com/economy.xml",
-            "매일경제": "https://www.mk.co.kr/rss/30000001/",
-            "한국경제": "https://www.hankyung.com/feed/economy",
-        }
-        return _get_rss(korean_rss_feeds, each=10)
+    def _run(self) -> str:
+        return _research("korean", self.name)
 
-class WebSearchToolInput(BaseModel):
-    url: str = Field(..., description="The URL to look for.")
+class SummarizeArticlesToolInput(BaseModel):
+    pass  # The articles come from the research tasks
 
-class WebSearchTool(BaseTool):
-    name: str = "web_search_tool"
-    description: str = "Web Content Scraper Tool. Scrape the web for the information based on the URL. Return the result in text format."
-    input_schema: Type[BaseModel] = WebSearchToolInput
-    
-    def _run(self, url: str) -> dict[str, str]:
-        try:
-            app = Firecrawl(api_key=FIRECRAWL_API_KEY)
-            response: Any = app.scrape(url=url)
+class SummarizeArticlesTool(BaseTool):
+    name: str = "summarize_articles_tool"
+    description: str = "Scrape and summarize all articles collected by the research tasks in token-budgeted batches. Returns the Korean summaries of every accessible article as a JSON object {\"articles\": [...]}."
+    input_schema: Type[BaseModel] = SummarizeArticlesToolInput
+    load_articles: Any = None  # callable returning the research articles
+    summarizer: Any = None  # summarizer.BatchSummarizer
 
-            title = getattr(response, "title", "No Title")
-            content = "No Content"
-            
-            if hasattr(response, "content"):
-                content = response.content
-            elif hasattr(response, "metadata"):
-                content = response.metadata
-            elif hasattr(response, "markdown"):
-                content = response.markdown
-            
-            return {
-                "title": title,
-                "url": url,
-                "content": content
-            }
-        except Exception as e:
-            print(f"Error scraping URL {url}: {str(e)}")
-            return {
-                "title": "Error",
-                "url": url,
-                "content": f"Failed to scrape content: {str(e)}"
-            }
+    def _run(self) -> str:
+        articles = self.load_articles()
+        scraped = batch_scraper.scrape_many([article["url"] for article in articles])
+        for article, page in zip(articles, scraped):
+            # Inaccessible pages fall back to the RSS summary.
+            article["content"] = article.get("summary", "") if page["title"] == "Error" else page["content"]
+        by_url = self.summarizer.summaries_by_url(articles)
+        # Tag each summary with its article's feed region for the per-chat selection in personalize.py.
+        regions = {source.name: source.region for source in feed_registry.sources()}
+        summaries = []
+        for article in articles:
+            if article["url"] in by_url:
+                summary = by_url[article["url"]]
+                summary["region"] = regions.get(article.get("source", ""), "")
+                summaries.append(summary)
+        article_store.evict()
+        return SummaryBatch(articles=summaries).model_dump_json(indent=2)
 
-web_search_tool = WebSearchTool()
 global_news_research_tool = GlobalNewsResearchTool()
 korean_news_research_tool = KoreanNewsResearchTool()
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Briefing workers for the bot's queue mode (BRIEFING_QUEUE=1).
+
+The bot enqueues briefing jobs in data/briefing_queue.db; each worker process
+leases one job at a time, runs the news crew and stores the briefing and its
+article pool as the job's result, which the bot picks up and delivers.
+
+Usage:
+    python worker.py                 # one worker process
+    python worker.py --processes 4   # four worker processes
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import Future, wait
+
+import env  # loads .env before the configuration below is read
+from briefing_queue import BriefingQueue
+
+DATA_DIR = os.getenv("DATA_DIR", "data")
+QUEUE_PATH = os.path.join(DATA_DIR, "briefing_queue.db")
+POLL_INTERVAL = 2.0  # seconds between lease attempts when the queue is empty
+# Seconds a job may run before it is given up and retried; the bot waits as long.
+JOB_TIMEOUT = float(os.getenv("BRIEFING_TIMEOUT", "900"))
+
+logger = logging.getLogger("worker")
+
+
+class JobTimedOut(Exception):
+    """Raised when a job is still running after the worker's job_timeout."""
+
+
+class Worker:
+    """
+    Leases briefing jobs and runs them one at a time. While a job runs, a
+    heartbeat thread renews its lease every third of the lease period, so a
+    crashed worker's job is taken over by another one once its lease expires.
+    A job still running after job_timeout seconds is failed (and so retried
+    after its backoff), and the worker moves on to the next one, leaving the
+    hung run to finish or hang in the background.
+    """
+
+    def __init__(
+        self,
+        queue: BriefingQueue,
+        worker_id: str,
+        poll_interval: float = POLL_INTERVAL,
+        job_timeout: float = JOB_TIMEOUT,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Stops leasing new jobs; the current job runs to completion."""
+        self._stopping.set()
+
+    def run(self):
+        from crew_runner import load_crew_stack
+
+        load_crew_stack()
+        logger.info(f"Worker {self.worker_id} ready")
+        while not self._stopping.is_set():
+            if not self.run_once():
+                self._stopping.wait(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """Runs one job if one is available; returns whether there was one."""
+        job = self.queue.lease(self.worker_id)
+        if job is None:
+            return False
+        logger.info(f"Worker {self.worker_id} running job {job.id} ({job.key}), attempt {job.attempts}")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._renew_lease, args=(job.id, done), daemon=True)
+        heartbeat.start()
+        run: Future[tuple[str, list[dict]]] = Future()
+        threading.Thread(target=self._kickoff, args=(run,), daemon=True, name=f"job-{job.id}").start()
+        try:
+            if not wait([run], timeout=self.job_timeout).done:
+                raise JobTimedOut(f"timed out after {self.job_timeout:g}s")
+            briefing, pool = run.result()
+        except JobTimedOut as e:
+            logger.error(f"Job {job.id} ({job.key}) {e}; giving it up")
+            self.queue.fail(job.id, self.worker_id, f"{type(e).__name__}: {e}")
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.key}) failed")
+            self.queue.fail(job.id, self.worker_id, f"{type(e).__name__}: {e}")
+        else:
+            if not self.queue.complete(job.id, self.worker_id, {"briefing": briefing, "pool": pool}):
+                logger.warning(f"Lost the lease of job {job.id} ({job.key}); its result was discarded")
+        finally:
+            done.set()
+            heartbeat.join()
+        self.queue.purge()
+        return True
+
+    @staticmethod
+    def _kickoff(run: Future):
+        from crew_runner import kickoff_crew
+
+        try:
+            run.set_result(kickoff_crew())
+        except BaseException as e:
+            run.set_exception(e)
+
+    def _renew_lease(self, job_id: int, done: threading.Event):
+        while not done.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(job_id, self.worker_id):
+                logger.warning(f"Worker {self.worker_id} no longer holds the lease of job {job_id}")
+                return
+
+
+def _run_worker():
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
+    worker = Worker(BriefingQueue(QUEUE_PATH), f"{socket.gethostname()}:{os.getpid()}")
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run briefing worker processes for the bot's queue mode.")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+    if args.processes == 1:
+        _run_worker()
+        return
+
+    processes = [multiprocessing.Process(target=_run_worker, name=f"worker-{i + 1}") for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    # Forward SIGTERM so each worker finishes its current job before exiting.
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()